@@ -22,12 +22,6 @@ if %errorlevel% neq 0 (
   set MISSING_PACKAGES=!MISSING_PACKAGES! opencv-python
 )
 
-:: Check pydub
-python -c "import pydub" 2>nul
-if %errorlevel% neq 0 (
-  set MISSING_PACKAGES=!MISSING_PACKAGES! pydub
-)
-
 :: Check vlc
 python -c "import vlc" 2>nul
 if %errorlevel% neq 0 (
@@ -5,35 +5,56 @@ SoftWhisper - Audio/Video Transcription Application using Whisper.cpp
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox, ttk
 import threading
+import collections
 import os
 import tempfile
 import sys
 import queue
 import time
 import json
-import psutil
 import urllib.request
+import http.client
 import re
-from diarization_gui import DiarizationOption
-
-# Import media player module
-from media_player import MediaPlayer, MediaPlayerUI
 
 # Import our simplest SRT functions
-from subtitles import save_whisper_as_srt, whisper_to_srt
+from subtitles import save_whisper_as_srt, whisper_to_srt, segments_to_srt
 
 # Import export button creation from file_export.py
 from file_export import create_export_button
 
 import subprocess
+import selectors
+import concurrent.futures
+import functools
+import hashlib
+import shutil
 import io
 import signal
-from pydub import AudioSegment
+import mmap
+import struct
+import socket
+import atexit
+import uuid
+
+# orjson is optional; it parses JSON several times faster than the json module
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 _app = None
 
-# Debug helper: Write messages to the original stdout
-def debug_print(msg):
+# Debug output is opt-in: set SOFTWHISPER_DEBUG=1 to enable it
+DEBUG_ENABLED = os.environ.get("SOFTWHISPER_DEBUG", "0") != "0"
+
+# Debug helper: Write messages to the original stdout. Extra args are
+# %-formatted into msg only when debug output is enabled.
+def debug_print(msg, *args):
+    if not DEBUG_ENABLED:
+        return
+    if args:
+        msg = msg % args
     # Write to original stdout (for terminal debugging)
     sys.__stdout__.write(f"DEBUG: {msg}\n")
     sys.__stdout__.flush()
@@ -42,13 +63,16 @@ def debug_print(msg):
     if _app is not None and hasattr(_app, 'console_queue'):
         _app.console_queue.put({'type': 'append', 'content': f"DEBUG: {msg}\n"})
 
+# Directory of this script; models live under it whatever the working directory is
+PROGRAM_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(PROGRAM_DIR, "models", "whisper")
+
 def get_default_whisper_cpp_path():
-    program_dir = os.path.dirname(os.path.abspath(__file__))
     if os.name == "nt":
         # Default Windows path: a directory; we'll later append the executable name.
-        return os.path.join(program_dir, "Whisper_win-x64")
+        return os.path.join(PROGRAM_DIR, "Whisper_win-x64")
     else:
-        return os.path.join(program_dir, "Whisper_lin-x64")
+        return os.path.join(PROGRAM_DIR, "Whisper_lin-x64")
 
 # Allowed model filenames for automatic download.
 ALLOWED_MODELS = [
@@ -60,52 +84,1151 @@ ALLOWED_MODELS = [
     "ggml-large-v3.bin", "ggml-large-v3-turbo.bin"
 ]
 
+# SHA-1 of the published models, from whisper.cpp's models/README.md
+MODEL_SHA1 = {
+    "ggml-tiny.bin": "bd577a113a864445d4c299885e0cb97d4ba92b5f",
+    "ggml-tiny.en.bin": "c78c86eb1a8faa21b369bcd33207cc90d64ae9df",
+    "ggml-base.bin": "465707469ff3a37a2b9b8d8f89f2f99de7299dac",
+    "ggml-base.en.bin": "137c40403d78fd54d454da0f9bd998f78703390c",
+    "ggml-small.bin": "55356645c2b361a969dfd0ef2c5a50d530afd8d5",
+    "ggml-small.en.bin": "db8a495a91d927739e50b3fc1cc4c6b8f6c2d022",
+    "ggml-medium.bin": "fd9727b6e1217c2f614f9b698455c4ffd82463b4",
+    "ggml-medium.en.bin": "8c30f0e44ce9560643ebd10bbe50cd20eafd3723",
+    "ggml-large-v2.bin": "0f4c8e34f21cf1a914c59d8b3ce882345ad349d6",
+    "ggml-large-v3.bin": "ad82bf6a9043ceed055076d0fd39f5f186ff8062",
+    "ggml-large-v3-turbo.bin": "4af2b29d7ec73d781377bfd1758ca957a807e941",
+}
+
+# Parallel HTTP connections used to download a model
+DOWNLOAD_CONNECTIONS = 8
+DOWNLOAD_BLOCK_SIZE = 1 << 20
+# Parallel downloads record their progress after about this many new bytes
+DOWNLOAD_STATE_INTERVAL = 32 << 20
+
 
 CONFIG_FILE = 'config.json'
+# Delay before pending config changes are written out
+CONFIG_SAVE_DELAY_MS = 500
 
 # Maximum duration per chunk in seconds
 MAX_CHUNK_DURATION = 120  
 
-# Redirect stdout and stderr to the UI console
+# Parallel chunking: ranges longer than one chunk are split into overlapping
+# windows that are transcribed by independent whisper.cpp processes.
+CHUNK_DURATION = 35
+CHUNK_OVERLAP = 1.0
+# Shortest run of common tokens accepted as the alignment of two chunks'
+# overlap (shorter overlaps need all of their tokens to match)
+MERGE_MIN_RUN = 3
+# Minimum threads given to each whisper.cpp worker when running chunks in parallel
+CHUNK_WORKER_THREADS = 2
+
+# Segment line printed by whisper.cpp on stdout:
+# [HH:MM:SS.mmm --> HH:MM:SS.mmm]  text
+_SEGMENT_RE = re.compile(
+    r'\[(\d{2}):(\d{2}):(\d{2})\.(\d{3}) --> (\d{2}):(\d{2}):(\d{2})\.(\d{3})\]\s*(.*)'
+)
+
+# Leading "[...]" timestamp of a whisper.cpp output line
+_BRACKET_RE = re.compile(r'^\[[^\]]+\]\s*')
+
+# Start timestamp of a segment line, used to report progress
+_PROGRESS_RE = re.compile(rb'\[(\d{2}):(\d{2}):(\d{2})\.(\d{3}) -->')
+
+# Progress line printed on stderr by whisper-cli's -pp (--print-progress)
+_PRINT_PROGRESS_RE = re.compile(rb'progress\s*=\s*(\d+)%')
+
+# whisper.cpp's report of the GPU backend it actually initialised (stderr)
+_GPU_BACKEND_RE = re.compile(rb'whisper_backend_init_gpu: (?:using (\S+) backend|(no GPU|failed))')
+
+# Size of each read from the whisper.cpp output pipes
+READ_CHUNK_SIZE = 65536
+
+# Only the most recent whisper.cpp stderr lines are kept
+STDERR_MAX_LINES = 2000
+
+# Minimum spacing between progress updates sent to the UI (~30 Hz)
+UI_UPDATE_INTERVAL_NS = 33_000_000
+
+# Seconds to wait for whisper-server to load its model, and for one request
+SERVER_START_TIMEOUT = 120
+SERVER_REQUEST_TIMEOUT = 600
+# How often a request in flight checks whether the job was stopped
+SERVER_CANCEL_POLL = 0.1
+
+# Queues wake the UI when something is put; this timer is only a safety net
+QUEUE_FALLBACK_MS = 500
+
+# Longest a partial console line is held back waiting for its newline
+CONSOLE_FLUSH_NS = 50_000_000
+
+# The console box is trimmed back to CONSOLE_KEEP_LINES once it passes CONSOLE_MAX_LINES
+CONSOLE_MAX_LINES = 1000
+CONSOLE_KEEP_LINES = 500
+
+# Decoded 16 kHz mono PCM is cached here so re-running on the same file
+# (e.g. with different start/end times) skips decoding entirely
+PCM_CACHE_DIR = os.path.join(tempfile.gettempdir(), "softwhisper-pcm")
+PCM_CACHE_FILES = 4
+
+# On Linux, caches up to this size go to tmpfs (/dev/shm) instead, so neither
+# writing nor slicing them touches the disk. tmpfs is RAM, so those entries
+# only last for the session (see _clear_shm_pcm_cache)
+PCM_SHM_DIR = os.path.join("/dev/shm", "softwhisper-pcm")
+PCM_SHM_MAX_BYTES = 256 << 20
+PCM_SAMPLE_RATE = 16000
+# Slices are written to whisper-cli's stdin in pieces of this size; it matches
+# the default Linux pipe buffer, so each write fits without a partial wakeup
+PCM_FEED_BLOCK_SIZE = 64 << 10
+
+def _remote_size(url):
+    # Size of the remote file if the server accepts byte ranges, else None.
+    # A one-byte GET is used because urllib turns a redirected HEAD into a GET.
+    req = urllib.request.Request(url, headers={'Range': 'bytes=0-0'})
+    with urllib.request.urlopen(req) as resp:
+        content_range = resp.headers.get('Content-Range', '')
+        if resp.status != 206 or '/' not in content_range:
+            return None
+        total = content_range.rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else None
+
+def _download_ranges(url, part_path, total, report):
+    # Fetch DOWNLOAD_CONNECTIONS byte ranges in parallel into a preallocated
+    # file. Each worker writes through its own handle at its range offset.
+    # Bytes finished per range are recorded in "<part_path>.state", so an
+    # interrupted download resumes where each range stopped.
+    step = -(-total // DOWNLOAD_CONNECTIONS)
+    ranges = [(a, min(a + step, total) - 1) for a in range(0, total, step)]
+    state_path = part_path + ".state"
+    progress = None
+    try:
+        with open(state_path, 'rb') as f:
+            state = _json_loads(f.read())
+        if (state.get('total') == total and len(state.get('done', [])) == len(ranges)
+                and os.path.getsize(part_path) == total):
+            progress = state['done']
+            debug_print(f"Resuming download at {sum(progress)} of {total} bytes")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if progress is None:
+        progress = [0] * len(ranges)
+        with open(part_path, 'wb') as f:
+            f.truncate(total)
+
+    done = [sum(progress)]
+    unsaved = [0]
+    lock = threading.Lock()
+
+    def _save_state():
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'total': total, 'done': progress}, f)
+        os.replace(tmp_path, state_path)
+
+    def _fetch(idx, first, last):
+        start = first + progress[idx]
+        if start > last:
+            return
+        req = urllib.request.Request(url, headers={'Range': f'bytes={start}-{last}'})
+        # Unbuffered, so bytes counted in the state are already with the OS
+        with urllib.request.urlopen(req) as resp, open(part_path, 'r+b', buffering=0) as f:
+            if resp.status != 206:
+                raise IOError(f"Server ignored range request (HTTP {resp.status})")
+            f.seek(start)
+            while True:
+                block = resp.read(DOWNLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                f.write(block)
+                with lock:
+                    progress[idx] += len(block)
+                    done[0] += len(block)
+                    unsaved[0] += len(block)
+                    report(done[0], total)
+                    if unsaved[0] >= DOWNLOAD_STATE_INTERVAL:
+                        unsaved[0] = 0
+                        _save_state()
+            with lock:
+                _save_state()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        for future in [executor.submit(_fetch, i, a, b) for i, (a, b) in enumerate(ranges)]:
+            future.result()
+    if os.path.getsize(part_path) != total or done[0] != total:
+        raise IOError("Incomplete download")
+    os.remove(state_path)
+
+def _download_single(url, part_path, report):
+    # One plain GET, streamed to disk with progress in bytes
+    with urllib.request.urlopen(url) as resp, open(part_path, 'wb') as f:
+        total = int(resp.headers.get('Content-Length') or 0)
+        done = 0
+        while True:
+            block = resp.read(DOWNLOAD_BLOCK_SIZE)
+            if not block:
+                break
+            f.write(block)
+            done += len(block)
+            report(done, total)
+
+def _download_aria2c(url, part_path, report):
+    # Let aria2c download with several connections, parsing its "(NN%)" summaries
+    cmd = [
+        "aria2c", "-x", str(DOWNLOAD_CONNECTIONS), "-s", str(DOWNLOAD_CONNECTIONS),
+        "--allow-overwrite=true", "--auto-file-renaming=false", "--summary-interval=1",
+        "--console-log-level=error", "-d", os.path.dirname(os.path.abspath(part_path)),
+        "-o", os.path.basename(part_path), url
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               encoding='utf-8', errors='replace')
+    for line in process.stdout:
+        match = re.search(r'\((\d+)%\)', line)
+        if match:
+            report(int(match.group(1)), 100)
+    if process.wait() != 0:
+        raise IOError(f"aria2c exited with code {process.returncode}")
+
+def _sha1_file(path):
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha1').hexdigest()
+        h = hashlib.sha1()
+        for block in iter(lambda: f.read(DOWNLOAD_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# A hashed model gets a "<model>.sha1" sidecar holding its hash and size,
+# so later launches only compare the size instead of hashing gigabytes
+def _write_model_sidecar(model_path, digest):
+    try:
+        with open(model_path + ".sha1", 'w') as f:
+            f.write(f"{digest} {os.path.getsize(model_path)}\n")
+    except OSError:
+        pass
+
+def _model_is_valid(model_path, on_hash=None):
+    expected = MODEL_SHA1.get(os.path.basename(model_path))
+    if not expected:
+        return True
+    try:
+        with open(model_path + ".sha1") as f:
+            digest, size = f.read().split()
+        if int(size) == os.path.getsize(model_path):
+            return digest == expected
+    except (OSError, ValueError):
+        pass
+    # No usable sidecar (older download, or the file changed): hash it once.
+    # The sidecar records the actual hash, so a mismatch is not re-hashed either.
+    if on_hash:
+        on_hash()
+    digest = _sha1_file(model_path)
+    _write_model_sidecar(model_path, digest)
+    return digest == expected
+
+# Download url to dest_path. Uses aria2c when installed, otherwise parallel
+# HTTP range requests (resumable), and falls back to a single GET on error. The
+# file is written to "<dest_path>.part", checked against MODEL_SHA1 when the
+# hash is known, and only then renamed into place. report(done, total) is
+# called with the progress.
+def _download_model(url, dest_path, report):
+    part_path = dest_path + ".part"
+    try:
+        if shutil.which("aria2c"):
+            _download_aria2c(url, part_path, report)
+        else:
+            total = _remote_size(url)
+            if not total:
+                raise IOError("Server does not support range requests")
+            _download_ranges(url, part_path, total, report)
+    except Exception as e:
+        if os.path.exists(part_path + ".state"):
+            # Keep the partial ranges; the next attempt resumes them
+            raise IOError(f"Download interrupted ({e}); it will resume on the next attempt") from e
+        debug_print(f"Parallel download failed ({e}); falling back to a single connection.")
+        _download_single(url, part_path, report)
+
+    expected = MODEL_SHA1.get(os.path.basename(dest_path))
+    if expected and _sha1_file(part_path) != expected:
+        os.remove(part_path)
+        raise Exception(f"Downloaded model {os.path.basename(dest_path)} failed checksum verification.")
+    os.replace(part_path, dest_path)
+    if expected:
+        _write_model_sidecar(dest_path, expected)
+
+# Redirect stdout and stderr to the UI console. Only done with debug output
+# enabled (off unless SOFTWHISPER_DEBUG is set), and only once per queue:
+# replacing a redirector would drop its buffered partial line.
 def set_console_redirect(console_queue):
+    if not DEBUG_ENABLED:
+        return
+    if isinstance(sys.stdout, ConsoleRedirector) and sys.stdout.console_queue is console_queue:
+        return
     sys.stdout = ConsoleRedirector(console_queue)
     sys.stderr = ConsoleRedirector(console_queue)
 
-# The transcribe_audio function with built-in logic to parse timestamps from
-# Whisper.cpp JSON lines.
-def transcribe_audio(file_path, options, progress_callback=None, status_callback=None, stop_event=None):
-    file_path = os.path.abspath(file_path)
-    debug_print(f"transcribe_audio() => Processing file: {file_path}")
-    model_name = options.get('model_name', 'base')
-    model_path = os.path.abspath(os.path.join("models", "whisper", f"ggml-{model_name}.bin"))
+# Put the real streams back, flushing anything still buffered
+def restore_console():
+    for stream in (sys.stdout, sys.stderr):
+        if isinstance(stream, ConsoleRedirector):
+            stream.flush()
+    sys.stdout = sys.__stdout__
+    sys.stderr = sys.__stderr__
+
+def _strip_timestamp(line):
+    # Remove the leading timestamp; partition() handles the common
+    # "[...] text" case without running the regex.
+    if line.startswith('['):
+        head, sep, tail = line.partition(']')
+        if sep and len(head) > 1:
+            return tail.lstrip()
+    return _BRACKET_RE.sub('', line)
+
+def _format_cs(cs):
+    # Centiseconds -> "HH:MM:SS.mmm" (whisper.cpp timestamp format)
+    ms = int(cs) * 10
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+def _parse_segments(raw, offset_cs=0):
+    # Parse whisper.cpp stdout lines into segments, with t0/t1 in centiseconds
+    # (whisper.cpp's own unit) shifted by offset_cs.
+    segments = []
+    for line in raw.splitlines():
+        match = _SEGMENT_RE.match(line.strip())
+        if not match:
+            continue
+        g = match.groups()
+        t0 = (int(g[0]) * 3600000 + int(g[1]) * 60000 + int(g[2]) * 1000 + int(g[3])) // 10
+        t1 = (int(g[4]) * 3600000 + int(g[5]) * 60000 + int(g[6]) * 1000 + int(g[7])) // 10
+        segments.append({'t0': t0 + offset_cs, 't1': t1 + offset_cs, 'text': g[8].strip()})
+    return segments
+
+def _segments_to_raw(segments):
+    # Rebuild whisper.cpp-style stdout from segments
+    return "\n".join(f"[{_format_cs(seg['t0'])} --> {_format_cs(seg['t1'])}]  {seg['text']}"
+                     for seg in segments)
+
+def _split_windows(start_sec, end_sec, chunk=CHUNK_DURATION, overlap=CHUNK_OVERLAP):
+    # Split [start_sec, end_sec] into windows of `chunk` seconds, each one
+    # extended by `overlap` seconds into the next window.
+    windows = []
+    s = start_sec
+    while s < end_sec:
+        windows.append((s, min(s + chunk + overlap, end_sec)))
+        s += chunk
+    # Fold a tiny trailing window into the previous one
+    if len(windows) > 1 and windows[-1][1] - windows[-1][0] <= overlap:
+        windows.pop()
+        windows[-1] = (windows[-1][0], end_sec)
+    return windows
+
+def _lcs_suffix_prefix(a, b):
+    # Longest common run of tokens between a (tail of chunk i) and b (head of
+    # chunk i+1). Returns the cut points (cut_a, cut_b) so that
+    # a[:cut_a] + b[cut_b:] keeps the common run exactly once, or None.
+    # The run only counts as the overlap when it is at least MERGE_MIN_RUN
+    # tokens long and sits in the back half of a and the front half of b;
+    # a stray common word elsewhere would cut away the text between them.
+    # Rolling DP over matching positions only: each row maps j to the length
+    # of the common run ending at a[i-1], b[j-1], so the work is proportional
+    # to the number of equal token pairs rather than len(a) * len(b).
+    positions = {}
+    for j, token in enumerate(b, 1):
+        positions.setdefault(token, []).append(j)
+    best_len, best_end_a, best_end_b = 0, 0, 0
+    prev = {}
+    for i, token in enumerate(a, 1):
+        cur = {}
+        for j in positions.get(token, ()):
+            length = prev.get(j - 1, 0) + 1
+            cur[j] = length
+            if length > best_len:
+                best_len, best_end_a, best_end_b = length, i, j
+        prev = cur
+    if best_len == 0 or best_len < min(MERGE_MIN_RUN, len(a), len(b)):
+        return None
+    if 2 * best_end_a < len(a) or 2 * (best_end_b - best_len) > len(b):
+        return None
+    return best_end_a, best_end_b
+
+def _normalize_token(token):
+    return token.strip(".,!?;:\"'()[]").lower()
+
+def _merge_overlap(prev_segments, next_segments, overlap_start_cs, overlap_end_cs):
+    # Deduplicate the text transcribed twice in the overlap between two
+    # consecutive chunks by aligning their tokens.
+    tail_idx = [i for i, seg in enumerate(prev_segments) if seg['t1'] > overlap_start_cs]
+    head_idx = [i for i, seg in enumerate(next_segments) if seg['t0'] < overlap_end_cs]
+    if not tail_idx or not head_idx:
+        return prev_segments + next_segments
+
+    # Tokens as (segment index, word) pairs
+    tail = [(i, w) for i in tail_idx for w in prev_segments[i]['text'].split()]
+    head = [(i, w) for i in head_idx for w in next_segments[i]['text'].split()]
+    cuts = _lcs_suffix_prefix([_normalize_token(w) for _, w in tail],
+                              [_normalize_token(w) for _, w in head])
+    if cuts is None:
+        # No reliable common run: cut both chunks at the middle of the overlap.
+        # A segment is kept if any of it lies on its chunk's side of the cut;
+        # the first segment of a chunk starts in the overlap but can run well
+        # past it, so dropping it by start time would lose that speech.
+        mid = (overlap_start_cs + overlap_end_cs) // 2
+        return ([seg for seg in prev_segments if seg['t0'] < mid] +
+                [seg for seg in next_segments if seg['t1'] > mid])
+
+    cut_a, cut_b = cuts
+
+    def _rebuild(segments, indices, tokens):
+        # Keep the untouched segments and rewrite the text of trimmed ones
+        kept = {}
+        for i, w in tokens:
+            kept.setdefault(i, []).append(w)
+        out = []
+        for i, seg in enumerate(segments):
+            if i not in indices:
+                out.append(seg)
+            elif i in kept:
+                out.append({'t0': seg['t0'], 't1': seg['t1'], 'text': " ".join(kept[i])})
+        return out
+
+    merged_prev = _rebuild(prev_segments, set(tail_idx), tail[:cut_a])
+    merged_next = _rebuild(next_segments, set(head_idx), head[cut_b:])
+    return merged_prev + merged_next
+
+def _s_to_sec(txt):
+    # Minimal inline parser supporting "HH:MM:SS", "MM:SS", or "SS"
+    if not txt:
+        return None
+    parts = txt.split(':')
+    try:
+        if len(parts) == 3:
+            h, m, s = parts
+            return int(h) * 3600 + int(m) * 60 + float(s)
+        elif len(parts) == 2:
+            m, s = parts
+            return int(m) * 60 + float(s)
+        else:
+            return float(parts[0])
+    except Exception:
+        return None
+
+def _last_segment_start(buf, start, end):
+    # Start time in milliseconds of the last segment line in buf[start:end],
+    # or None. The "[HH:MM:SS.mmm" prefix is fixed width, so the last line is
+    # parsed by offset; the regex is only a fallback for other layouts.
+    i = buf.rfind(b'\n', start, end) + 1 or start
+    if end - i >= 13 and buf[i] == 0x5B and buf[i + 9] == 0x2E:  # '[' and '.'
+        try:
+            return ((int(buf[i + 1:i + 3]) * 3600 + int(buf[i + 4:i + 6]) * 60 +
+                     int(buf[i + 7:i + 9])) * 1000 + int(buf[i + 10:i + 13]))
+        except ValueError:
+            pass
+    match = None
+    for match in _PROGRESS_RE.finditer(buf, start, end):
+        pass
+    if match is None:
+        return None
+    h, m, s, ms = match.groups()
+    return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + int(ms)
+
+def _iter_process_output(process, timeout=0.5):
+    # Yield (stream, data) as bytes arrive on the process' stdout/stderr, where
+    # stream is 'stdout' or 'stderr', and (None, None) after `timeout` seconds
+    # without output. Ends once both pipes are closed.
+    if os.name == "nt":
+        # selectors cannot wait on pipes on Windows: pump them from threads
+        events = queue.Queue()
+
+        def _pump(pipe, name):
+            for data in iter(lambda: pipe.read(READ_CHUNK_SIZE), b""):
+                events.put((name, data))
+            events.put((name, b""))
+
+        for pipe, name in ((process.stdout, 'stdout'), (process.stderr, 'stderr')):
+            threading.Thread(target=_pump, args=(pipe, name), daemon=True).start()
+
+        open_pipes = 2
+        while open_pipes:
+            try:
+                name, data = events.get(timeout=timeout)
+            except queue.Empty:
+                yield None, None
+                continue
+            if not data:
+                open_pipes -= 1
+                continue
+            yield name, data
+    else:
+        with selectors.DefaultSelector() as sel:
+            sel.register(process.stdout, selectors.EVENT_READ, 'stdout')
+            sel.register(process.stderr, selectors.EVENT_READ, 'stderr')
+            while sel.get_map():
+                ready = sel.select(timeout)
+                if not ready:
+                    yield None, None
+                    continue
+                for key, _ in ready:
+                    data = os.read(key.fd, READ_CHUNK_SIZE)
+                    if not data:
+                        sel.unregister(key.fileobj)
+                        continue
+                    yield key.data, data
+
+# Start child processes in their own process group so they can be signalled
+# together with anything they spawn
+if os.name == 'nt':
+    _GROUP_POPEN_KWARGS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _GROUP_POPEN_KWARGS = {'start_new_session': True}
+
+# Terminate a process started with _GROUP_POPEN_KWARGS and its children
+def _kill_group(process, timeout=5):
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+    except (OSError, ValueError):
+        pass
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        # Ignored the polite request; force it
+        try:
+            if os.name == 'nt':
+                process.kill()
+            else:
+                os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        except OSError:
+            pass
+
+# Run func(*args) on a daemon thread and return a Future for its result.
+# Unlike an executor's threads, it never holds up interpreter exit.
+def _run_in_background(func, *args):
+    future = concurrent.futures.Future()
+
+    def _run():
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=_run, daemon=True).start()
+    return future
+
+# List a directory in the background so a file dialog opened on it later finds
+# the metadata already cached (noticeable on network shares)
+def _prewarm_dir(path):
+    def _scan():
+        try:
+            with os.scandir(path) as entries:
+                for _ in entries:
+                    pass
+        except OSError:
+            pass
+    threading.Thread(target=_scan, daemon=True).start()
+
+# Pull a model file into the page cache in the background, so the first
+# transcription after a model change does not wait on cold disk reads
+def _prewarm_model(path):
+    def _read():
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                if hasattr(os, 'posix_fadvise'):
+                    # Let the kernel read ahead asynchronously
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    return
+                buf = bytearray(READ_CHUNK_SIZE * 16)
+                while f.readinto(buf):
+                    pass
+        except OSError:
+            pass
+    threading.Thread(target=_read, daemon=True).start()
+
+@functools.lru_cache(maxsize=None)
+def _model_path(model_name):
+    return os.path.join(MODEL_DIR, f"ggml-{model_name}.bin")
+
+@functools.lru_cache(maxsize=1)
+def _physical_cores():
+    # psutil is only needed for this, so it is imported on first use
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+    except ImportError:
+        count = None
+    count = count or os.cpu_count() or 1
+    # Never more than the CPUs this process may run on (taskset, containers)
+    if hasattr(os, 'sched_getaffinity'):
+        count = min(count, len(os.sched_getaffinity(0)))
+    return max(1, count)
+
+@functools.lru_cache(maxsize=1)
+def _compute_cpus():
+    # One logical CPU per physical core (the first SMT sibling), so whisper.cpp
+    # threads do not share a core with each other. Linux only; None elsewhere.
+    if not hasattr(os, 'sched_getaffinity'):
+        return None
+    cpus = set()
+    seen = set()
+    for cpu in sorted(os.sched_getaffinity(0)):
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+                siblings = f.read().strip()
+        except OSError:
+            return None
+        if siblings not in seen:
+            seen.add(siblings)
+            cpus.add(cpu)
+    return cpus or None
+
+def _pin_to_compute_cpus(pid):
+    cpus = _compute_cpus()
+    if cpus:
+        try:
+            os.sched_setaffinity(pid, cpus)
+        except OSError:
+            pass
+
+@functools.lru_cache(maxsize=32)
+def _probe_duration_cached(file_path, mtime_ns, size):
+    # Media duration in seconds from the container header, without decoding.
+    # mtime_ns and size are part of the cache key so edited files are re-probed.
+    output = subprocess.check_output(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", file_path],
+        stderr=subprocess.DEVNULL
+    )
+    return float(output.decode().strip())
+
+def _probe_duration(file_path):
+    st = os.stat(file_path)
+    return _probe_duration_cached(file_path, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=8)
+def _probe_gpu_cached(exe_path, mtime_ns):
+    # Which GPU-related flags this whisper-cli build understands. GPU builds
+    # offload by default, so the flags are only needed to opt out (--no-gpu)
+    # or to turn on flash attention.
+    try:
+        output = subprocess.run(
+            [exe_path, "--help"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL, timeout=10
+        ).stdout.decode('utf-8', 'replace')
+    except (OSError, subprocess.SubprocessError):
+        output = ""
+    return {
+        'no_gpu': '--no-gpu' in output,
+        'flash_attn': '--flash-attn' in output
+    }
+
+def _probe_gpu(exe_path):
+    try:
+        mtime_ns = os.stat(exe_path).st_mtime_ns
+    except OSError:
+        return {'no_gpu': False, 'flash_attn': False}
+    return _probe_gpu_cached(exe_path, mtime_ns)
+
+# whisper-cli arguments selecting the compute backend for these options
+def _gpu_args(options):
+    caps = _probe_gpu(options['whisper_executable'])
+    if not options.get('use_gpu', True):
+        return ["--no-gpu"] if caps['no_gpu'] else []
+    return ["--flash-attn"] if caps['flash_attn'] else []
+
+def _pcm_cache_dirs():
+    if os.name != 'nt' and os.access(os.path.dirname(PCM_SHM_DIR), os.W_OK):
+        return [PCM_SHM_DIR, PCM_CACHE_DIR]
+    return [PCM_CACHE_DIR]
+
+def _pcm_cache_name(file_path):
+    st = os.stat(file_path)
+    key = hashlib.sha1(f"{file_path}|{st.st_mtime_ns}|{st.st_size}".encode('utf-8')).hexdigest()
+    return key + ".pcm"
+
+# tmpfs when the decoded audio is small and there is room for it, else disk
+def _pcm_build_dir(expected_size):
+    if expected_size is not None and expected_size <= PCM_SHM_MAX_BYTES and PCM_SHM_DIR in _pcm_cache_dirs():
+        try:
+            if shutil.disk_usage(os.path.dirname(PCM_SHM_DIR)).free > 2 * expected_size:
+                return PCM_SHM_DIR
+        except OSError:
+            pass
+    return PCM_CACHE_DIR
+
+# tmpfs cache entries this session created or reused
+_shm_pcm_paths = set()
+
+# Remove this session's tmpfs entries so they don't hold RAM until reboot;
+# the on-disk cache is what persists between sessions
+def _clear_shm_pcm_cache():
+    while _shm_pcm_paths:
+        try:
+            os.remove(_shm_pcm_paths.pop())
+        except OSError:
+            pass
+
+atexit.register(_clear_shm_pcm_cache)
+
+def _prune_pcm_cache():
+    for cache_dir in _pcm_cache_dirs():
+        try:
+            entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+                       if name.endswith(".pcm")]
+            entries.sort(key=os.path.getmtime, reverse=True)
+            for stale in entries[PCM_CACHE_FILES:]:
+                os.remove(stale)
+        except OSError:
+            pass
+
+@functools.lru_cache(maxsize=8)
+def _wav_pcm_span_cached(file_path, mtime_ns, size):
+    # Walk the RIFF chunks; only plain (or extensible) 16-bit PCM, mono, at
+    # PCM_SAMPLE_RATE qualifies
+    with open(file_path, 'rb') as f:
+        head = f.read(12)
+        if len(head) < 12 or head[:4] != b'RIFF' or head[8:] != b'WAVE':
+            return None
+        pos = 12
+        fmt_ok = False
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    return None
+                tag, channels, rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if tag == 0xFFFE and len(fmt) >= 26:
+                    tag = struct.unpack('<H', fmt[24:26])[0]
+                fmt_ok = tag == 1 and channels == 1 and rate == PCM_SAMPLE_RATE and bits == 16
+                if not fmt_ok:
+                    return None
+            elif chunk_id == b'data':
+                if not fmt_ok:
+                    return None
+                # Streamed WAVs may leave the size as 0 or 0xFFFFFFFF
+                available = size - pos - 8
+                data_size = chunk_size if 0 < chunk_size <= available else available
+                return pos + 8, data_size & ~1
+            pos += 8 + chunk_size + (chunk_size & 1)
+            f.seek(pos)
+
+# (offset, size) of the samples when file_path is a WAV that already holds
+# 16 kHz mono s16le, so it can be sliced directly; None otherwise
+def _wav_pcm_span(file_path):
+    try:
+        st = os.stat(file_path)
+        return _wav_pcm_span_cached(file_path, st.st_mtime_ns, st.st_size)
+    except (OSError, struct.error):
+        return None
+
+# (offset, size) of the samples in a path returned by _get_cached_pcm
+def _pcm_span(pcm_path):
+    if os.path.dirname(pcm_path) not in _pcm_cache_dirs():
+        span = _wav_pcm_span(pcm_path)
+        if span:
+            return span
+    return 0, os.path.getsize(pcm_path)
+
+# Path of the cached raw s16le PCM for file_path. When it is missing and build
+# is set, the whole file is decoded once with ffmpeg; otherwise None is returned.
+# A WAV that is already 16 kHz mono s16le serves as its own cache.
+# expected_size (bytes) decides whether the cache may live on tmpfs.
+def _get_cached_pcm(file_path, build=True, stop_event=None, expected_size=None):
+    if _wav_pcm_span(file_path):
+        return file_path
+    name = _pcm_cache_name(file_path)
+    for cache_dir in _pcm_cache_dirs():
+        cache_path = os.path.join(cache_dir, name)
+        if os.path.exists(cache_path):
+            if cache_dir == PCM_SHM_DIR:
+                _shm_pcm_paths.add(cache_path)
+            return cache_path
+    if not build:
+        return None
+
+    cache_dir = _pcm_build_dir(expected_size)
+    cache_path = os.path.join(cache_dir, name)
+    os.makedirs(cache_dir, exist_ok=True)
+    part_path = f"{cache_path}.{os.getpid()}.part"
+    ff = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", file_path,
+         "-vn", "-sn", "-dn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE), "-f", "s16le", part_path],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                ff.wait(timeout=0.2)
+                break
+            except subprocess.TimeoutExpired:
+                if stop_event and stop_event.is_set():
+                    ff.kill()
+        if ff.returncode != 0:
+            return None
+        os.replace(part_path, cache_path)
+        if cache_dir == PCM_SHM_DIR:
+            _shm_pcm_paths.add(cache_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    _prune_pcm_cache()
+    return cache_path
+
+def _wav_header(data_size):
+    # Canonical 44-byte header for 16-bit mono PCM at PCM_SAMPLE_RATE
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, 1,
+        PCM_SAMPLE_RATE, PCM_SAMPLE_RATE * 2, 2, 16, b'data', data_size
+    )
+
+# Write [start_ms, end_ms] of a cached PCM file to pipe as a WAV stream.
+# The slice comes straight out of the mmap, so nothing is decoded or copied.
+def _feed_pcm(pcm_path, start_ms, end_ms, pipe):
+    try:
+        offset, size = _pcm_span(pcm_path)
+        with open(pcm_path, 'rb') as f:
+            start = offset + min(size, start_ms * PCM_SAMPLE_RATE // 1000 * 2)
+            end = max(start, offset + min(size, end_ms * PCM_SAMPLE_RATE // 1000 * 2))
+            pipe.write(_wav_header(end - start))
+            if end > start:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    block = None
+                    try:
+                        for pos in range(start, end, PCM_FEED_BLOCK_SIZE):
+                            block = view[pos:min(end, pos + PCM_FEED_BLOCK_SIZE)]
+                            while block:
+                                block = block[pipe.write(block):]
+                    finally:
+                        # The mmap cannot be closed while slices of it exist
+                        block = None
+                        view.release()
+    except OSError:
+        # whisper-cli exited or was killed before reading everything
+        pass
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+# Run whisper.cpp over [start_sec, end_sec] of the file. The range is sliced
+# from the cached PCM when pcm_path is given; otherwise ffmpeg decodes only
+# that range to 16 kHz mono WAV. Either way it is piped into whisper-cli's stdin.
+# Segment timestamps are shifted so they are relative to the start of the file.
+def _transcribe_range(file_path, start_sec, end_sec, options, threads=None,
+                      progress_callback=None, stop_event=None, segment_callback=None,
+                      pcm_path=None, backend_callback=None):
+    # Resolved once on the Tk thread by _collect_options
+    model_path = options.get('model_path') or _model_path(options.get('model_name', 'base'))
     language = options.get('language', 'auto')
     beam_size = min(int(options.get('beam_size', 5)), 8)
     task = options.get('task', 'transcribe')
 
-    audio = AudioSegment.from_file(file_path)
-    audio_length = len(audio) / 1000.0
+    # Integer millisecond bounds, computed once and used for seeking, slicing
+    # and progress alike
+    start_ms = round(start_sec * 1000)
+    end_ms = round(end_sec * 1000)
+    den_ms = max(1, end_ms - start_ms)
+
+    ffmpeg_cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-ss", f"{start_ms / 1000:.3f}", "-to", f"{end_ms / 1000:.3f}", "-i", file_path,
+        "-vn", "-sn", "-dn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE), "-f", "wav", "pipe:1"
+    ]
+
+    cmd = [
+        options['whisper_executable'], "-m", model_path,
+        "-f", "-", "-bs", str(beam_size), "-pp",
+        "-l", language, "--prompt", "Always use punctuation. Do not use dashes to indicate dialog. Do not censor any words."
+    ]
+    if threads:
+        cmd += ["-t", str(threads)]
+    cmd += _gpu_args(options)
+    if task == "translate":
+        cmd.append("-translate")
+
+    if DEBUG_ENABLED:
+        debug_print("Running Whisper.cpp with command: %s", ' '.join(cmd))
+    env = os.environ.copy()
+
+    ff = None
+    feeder = None
+    if pcm_path:
+        stdin = subprocess.PIPE
+    else:
+        ff = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        stdin = ff.stdout
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            env=env,
+            **_GROUP_POPEN_KWARGS
+        )
+        _pin_to_compute_cpus(process.pid)
+        if ff is not None:
+            # Only whisper-cli reads the pipe; it sees EOF when ffmpeg exits
+            ff.stdout.close()
+        else:
+            feeder = threading.Thread(target=_feed_pcm, args=(pcm_path, start_ms, end_ms, process.stdin),
+                                      daemon=True)
+            feeder.start()
+
+        stdout_buf = bytearray()
+        segments = []  # parsed as complete lines arrive
+        stderr_lines = collections.deque(maxlen=STDERR_MAX_LINES)
+        stderr_partial = b""
+        scanned = 0  # stdout bytes already scanned for progress
+        offset_cs = (start_ms + 5) // 10
+        reported = 0  # progress only moves forward, whichever stream reports it
+        last_output_time = time.time()
+        STALL_TIMEOUT = 60  # seconds without output -> consider stalled
+
+        for stream, data in _iter_process_output(process):
+            if stop_event and stop_event.is_set():
+                _kill_group(process)
+                break
+
+            if stream is None:
+                if time.time() - last_output_time > STALL_TIMEOUT:
+                    debug_print("Whisper.cpp appears stalled; terminating process to avoid hang.")
+                    _kill_group(process)
+                    break
+                continue
+
+            last_output_time = time.time()
+            if stream == 'stderr':
+                lines = (stderr_partial + data).splitlines(keepends=True)
+                stderr_partial = b""
+                if not lines[-1].endswith((b'\n', b'\r')):
+                    stderr_partial = lines.pop()
+                stderr_lines.extend(lines)
+                # Name the backend whisper.cpp really loaded (a failed GPU init
+                # reports after the "using" line, so the last match wins)
+                if backend_callback and lines:
+                    chunk = b"".join(lines)
+                    if b"backend_init_gpu" in chunk:
+                        match = None
+                        for match in _GPU_BACKEND_RE.finditer(chunk):
+                            pass
+                        if match is not None:
+                            name = match.group(1)
+                            backend_callback(f"GPU: {name.decode('utf-8', 'replace')}" if name else "CPU")
+                # -pp progress advances through long silences, when no segments print
+                if progress_callback and lines:
+                    chunk = b"".join(lines)
+                    if b"progress" in chunk:
+                        match = None
+                        for match in _PRINT_PROGRESS_RE.finditer(chunk):
+                            pass
+                        if match is not None:
+                            progress = min(100, int(match.group(1)))
+                            if progress > reported:
+                                reported = progress
+                                progress_callback(progress)
+                continue
+
+            stdout_buf.extend(data)
+            # Only scan complete lines that have not been scanned yet
+            end = stdout_buf.rfind(b'\n')
+            if end >= scanned:
+                current = _last_segment_start(stdout_buf, scanned, end)
+                new_segments = _parse_segments(stdout_buf[scanned:end].decode('utf-8', 'replace'),
+                                               offset_cs=offset_cs)
+                segments.extend(new_segments)
+                if segment_callback:
+                    for seg in new_segments:
+                        segment_callback(seg)
+                scanned = end + 1
+                if current is not None and progress_callback:
+                    progress = max(0, min(100, current * 100 // den_ms))
+                    if progress > reported:
+                        reported = progress
+                        progress_callback(progress)
+
+        process.wait()
+    finally:
+        if ff is not None:
+            if ff.poll() is None:
+                ff.kill()
+            ff.wait()
+        if feeder is not None:
+            feeder.join()
+
+    # A final line without a trailing newline has not been parsed yet
+    segments.extend(_parse_segments(stdout_buf[scanned:].decode('utf-8', 'replace'), offset_cs=offset_cs))
+    raw = stdout_buf.decode('utf-8', 'replace').strip()
+    return {
+        'raw': raw,
+        'segments': segments,
+        'stderr': (b"".join(stderr_lines) + stderr_partial).decode('utf-8', 'replace'),
+        'cancelled': bool(stop_event and stop_event.is_set())
+    }
+
+# whisper-server built next to whisper-cli, or None
+def _server_executable(cli_path):
+    name = "whisper-server.exe" if os.name == 'nt' else "whisper-server"
+    path = os.path.join(os.path.dirname(cli_path), name)
+    return path if os.path.isfile(path) else None
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# A whisper-server process that keeps one model loaded across transcriptions,
+# so only the first request pays for loading it
+class WhisperServer:
+    def __init__(self, exe_path, model_path, threads, use_gpu=True):
+        self.key = (exe_path, model_path, threads, use_gpu)
+        port = _free_port()
+        self.port = port
+        cmd = [exe_path, "-m", model_path, "-t", str(threads),
+               "--host", "127.0.0.1", "--port", str(port)]
+        cmd += _gpu_args({'whisper_executable': exe_path, 'use_gpu': use_gpu})
+        debug_print(f"Starting whisper-server: {' '.join(cmd)}")
+        self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL, **_GROUP_POPEN_KWARGS)
+        _pin_to_compute_cpus(self.process.pid)
+        # The server only starts listening once the model is loaded
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"whisper-server exited with code {self.process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("whisper-server did not start listening in time")
+                time.sleep(0.1)
+        # The server runs in its own process group, so it would outlive us
+        atexit.register(self.close)
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def close(self):
+        _kill_group(self.process)
+
+    # POST a WAV to /inference; returns segments with times in centiseconds.
+    # Setting stop_event aborts the request: whisper-server cannot cancel one,
+    # so the server is shut down (and restarted by the next job).
+    def transcribe(self, wav_bytes, fields, stop_event=None):
+        boundary = uuid.uuid4().hex
+        body = bytearray()
+        for name, value in fields.items():
+            body += (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                     f'{value}\r\n').encode('utf-8')
+        body += (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="audio.wav"\r\n'
+                 f'Content-Type: audio/wav\r\n\r\n').encode('utf-8')
+        body += wav_bytes
+        body += f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        done = threading.Event()
+
+        def _watch():
+            while not done.is_set():
+                if stop_event.wait(SERVER_CANCEL_POLL):
+                    if not done.is_set():
+                        self.close()
+                    return
+        if stop_event is not None:
+            threading.Thread(target=_watch, daemon=True).start()
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=SERVER_REQUEST_TIMEOUT)
+        try:
+            conn.request("POST", "/inference", body=bytes(body),
+                         headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+            response = conn.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"whisper-server: HTTP {response.status}")
+            data = _json_loads(payload)
+        finally:
+            done.set()
+            conn.close()
+        if 'error' in data:
+            raise RuntimeError(f"whisper-server: {data['error']}")
+        return [
+            {'t0': round(seg['start'] * 100), 't1': round(seg['end'] * 100), 'text': seg['text'].strip()}
+            for seg in data.get('segments', [])
+        ]
+
+# 16 kHz mono s16le PCM for [start_ms, end_ms]: sliced from the cache when
+# there is one, otherwise decoded by ffmpeg
+def _read_pcm_range(file_path, start_ms, end_ms, pcm_path=None):
+    if pcm_path:
+        offset, size = _pcm_span(pcm_path)
+        with open(pcm_path, 'rb') as f:
+            start = min(size, start_ms * PCM_SAMPLE_RATE // 1000 * 2)
+            f.seek(offset + start)
+            return f.read(max(0, min(size, end_ms * PCM_SAMPLE_RATE // 1000 * 2) - start))
+    return subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error",
+         "-ss", f"{start_ms / 1000:.3f}", "-to", f"{end_ms / 1000:.3f}", "-i", file_path,
+         "-vn", "-sn", "-dn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+    ).stdout
+
+# Same contract as _transcribe_range, but the window is sent to a running
+# WhisperServer instead of starting whisper-cli
+def _transcribe_range_server(server, file_path, start_sec, end_sec, options, progress_callback=None,
+                             stop_event=None, segment_callback=None, pcm_path=None):
+    if stop_event and stop_event.is_set():
+        return {'raw': "", 'segments': [], 'stderr': "", 'cancelled': True}
+    start_ms = round(start_sec * 1000)
+    end_ms = round(end_sec * 1000)
+    pcm = _read_pcm_range(file_path, start_ms, end_ms, pcm_path)
+    fields = {
+        'response_format': 'verbose_json',
+        'language': options.get('language', 'auto'),
+        'beam_size': min(int(options.get('beam_size', 5)), 8),
+        'translate': 'true' if options.get('task') == 'translate' else 'false',
+        'prompt': "Always use punctuation. Do not use dashes to indicate dialog. Do not censor any words."
+    }
+    offset_cs = (start_ms + 5) // 10
+    segments = [
+        {'t0': seg['t0'] + offset_cs, 't1': seg['t1'] + offset_cs, 'text': seg['text']}
+        for seg in server.transcribe(_wav_header(len(pcm)) + pcm, fields, stop_event)
+    ]
+    if segment_callback:
+        for seg in segments:
+            segment_callback(seg)
+    if progress_callback:
+        progress_callback(100)
+    return {
+        'raw': _segments_to_raw(segments),
+        'segments': segments,
+        'stderr': "",
+        'cancelled': bool(stop_event and stop_event.is_set())
+    }
+
+# The transcribe_audio function with built-in logic to parse timestamps from
+# Whisper.cpp output lines. Long ranges are split into overlapping chunks that
+# are transcribed in parallel and merged back together. segment_callback, if
+# given, receives each segment as soon as whisper.cpp prints it.
+def transcribe_audio(file_path, options, progress_callback=None, status_callback=None, stop_event=None,
+                     segment_callback=None):
+    file_path = os.path.abspath(file_path)
+    debug_print(f"transcribe_audio() => Processing file: {file_path}")
+
+    audio_length = _probe_duration(file_path)
 
     # Parse start/end directly from options and clamp to audio duration
     start_text = options.get('start_time', '').strip()
     end_text = options.get('end_time', '').strip()
 
-    def _s_to_sec(txt):
-        # Minimal inline parser supporting "HH:MM:SS", "MM:SS", or "SS"
-        if not txt:
-            return None
-        parts = txt.split(':')
-        try:
-            if len(parts) == 3:
-                h, m, s = parts
-                return int(h) * 3600 + int(m) * 60 + float(s)
-            elif len(parts) == 2:
-                m, s = parts
-                return int(m) * 60 + float(s)
-            else:
-                return float(parts[0])
-        except Exception:
-            return None
-
     start_override = _s_to_sec(start_text) or 0.0
     end_override = _s_to_sec(end_text) if end_text else None
     if end_override is None or end_override <= 0:
@@ -125,105 +1248,153 @@ def transcribe_audio(file_path, options, progress_callback=None, status_callback
             'cancelled': bool(stop_event and stop_event.is_set())
         }
 
-    trimmed_audio = audio[int(start_sec * 1000):int(end_sec * 1000)]
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        trimmed_audio.export(tmp.name, format="wav")
-        temp_audio_path = tmp.name
-
-    cmd = [
-        options['whisper_executable'], "-m", model_path,
-        "-f", temp_audio_path, "-bs", str(beam_size), "-pp",
-        "-l", language, "-oj", "--prompt", "Always use punctuation. Do not use dashes to indicate dialog. Do not censor any words."
-    ]
-    if task == "translate":
-        cmd.append("-translate")
-
-    debug_print(f"Running Whisper.cpp with command: {' '.join(cmd)}")
-    env = os.environ.copy()
-
-    process = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding='utf-8',
-        errors='replace',
-        bufsize=1,
-        env=env
-    )
-
-    stderr_data = []
-    threading.Thread(
-        target=lambda: [stderr_data.append(line) for line in iter(process.stderr.readline, "")],
-        daemon=True
-    ).start()
-
-    stdout_lines = []
-    last_output_time = time.time()
-    STALL_TIMEOUT = 60  # seconds without output -> consider stalled
-
-    while process.poll() is None:
-        if stop_event and stop_event.is_set():
-            try:
-                psutil.Process(process.pid).kill()
-            except Exception:
-                pass
-            break
+    # Reuse the decoded PCM from an earlier run; a whole-file run builds it
+    covers_file = start_sec <= 0.001 and end_sec >= audio_length - 0.001
+    try:
+        pcm_path = _get_cached_pcm(file_path, build=covers_file, stop_event=stop_event,
+                                   expected_size=int(audio_length * PCM_SAMPLE_RATE) * 2)
+    except (OSError, subprocess.SubprocessError) as e:
+        debug_print(f"PCM cache unavailable: {e}")
+        pcm_path = None
+    if pcm_path:
+        debug_print(f"Using PCM samples from: {pcm_path}")
+
+    num_threads = int(options.get('num_threads', 1))
+    max_workers = max(1, num_threads // CHUNK_WORKER_THREADS)
+    windows = _split_windows(start_sec, end_sec)
+    sequential = max_workers == 1 or len(windows) == 1
+    # The server handles one request at a time, so it is only used when the
+    # windows would run one after another anyway; otherwise parallel
+    # whisper-cli processes are faster despite each loading the model.
+    # options['whisper_server'] returns a running server (or None), so one
+    # is only started when this run will use it.
+    server = None
+    if sequential and options.get('whisper_server') is not None:
+        server = options['whisper_server']()
+    # With a server the model stays loaded and windows are sent one at a
+    # time, so progress and segments still arrive as each one finishes
+    if server is None and sequential:
+        # Not worth splitting: one whisper.cpp process over the whole range
+        windows = [(start_sec, end_sec)]
+
+    # Until whisper.cpp reports the backend it loaded (whisper-server's output
+    # is not read), the label only reflects what the user asked for
+    backend = ["GPU requested" if options.get('use_gpu', True) else "CPU"]
+
+    def _backend_callback(name):
+        backend[0] = name
+
+    # Per-window progress, reported as the duration-weighted mean
+    window_progress = [0] * len(windows)
+    progress_lock = threading.Lock()
+    total_weight = max(0.001, sum(w_end - w_start for w_start, w_end in windows))
+
+    def _window_progress_callback(idx):
+        def _callback(progress):
+            if not progress_callback:
+                return
+            with progress_lock:
+                window_progress[idx] = progress
+                done = sum(p * (w[1] - w[0]) for p, w in zip(window_progress, windows))
+            overall = int(max(0.0, min(100.0, done / total_weight)))
+            progress_callback(overall, f"Transcribing ({backend[0]}): {overall}%")
+        return _callback
+
+    # Streamed segments are passed on in file order: a window's segments are
+    # held back until every earlier window has finished.
+    pending_segments = [[] for _ in windows]
+    finished = [False] * len(windows)
+    current_window = [0]
+    stream_lock = threading.Lock()
+
+    def _window_segment_callback(idx):
+        def _callback(seg):
+            with stream_lock:
+                if idx == current_window[0]:
+                    segment_callback(seg)
+                else:
+                    pending_segments[idx].append(seg)
+        return _callback if segment_callback else None
 
-        line = process.stdout.readline()
-        if line:
-            last_output_time = time.time()
-            stdout_lines.append(line)
-            match = re.search(r'\[(\d{2}:\d{2}:\d{2}\.\d{3}) -->', line)
-            if match and progress_callback:
-                h, m, s_ms = match.group(1).split(':')
-                s, ms = s_ms.split('.')
-                current = int(h) * 3600 + int(m) * 60 + int(s) + float(ms) / 1000
-                den = max(0.001, (end_sec - start_sec))
-                progress = int(max(0.0, min(100.0, (current / den) * 100)))
-                progress_callback(progress, f"Transcribing: {progress}%")
-        else:
-            if time.time() - last_output_time > STALL_TIMEOUT:
-                debug_print("Whisper.cpp appears stalled; terminating process to avoid hang.")
+    def _run_window(idx, w_start, w_end, threads):
+        try:
+            if server is not None:
                 try:
-                    psutil.Process(process.pid).kill()
-                except Exception:
-                    pass
+                    return _transcribe_range_server(server, file_path, w_start, w_end, options,
+                                                    _window_progress_callback(idx), stop_event,
+                                                    _window_segment_callback(idx), pcm_path)
+                except (OSError, ValueError, RuntimeError, http.client.HTTPException,
+                        subprocess.SubprocessError) as e:
+                    if stop_event and stop_event.is_set():
+                        # The server was shut down to cancel this request
+                        return {'raw': "", 'segments': [], 'stderr': "", 'cancelled': True}
+                    debug_print(f"whisper-server request failed, using whisper-cli: {e}")
+                    threads = num_threads
+            return _transcribe_range(file_path, w_start, w_end, options, threads,
+                                     _window_progress_callback(idx), stop_event,
+                                     _window_segment_callback(idx), pcm_path, _backend_callback)
+        finally:
+            with stream_lock:
+                finished[idx] = True
+                while current_window[0] < len(windows) and finished[current_window[0]]:
+                    current_window[0] += 1
+                    if current_window[0] < len(windows) and segment_callback:
+                        for seg in pending_segments[current_window[0]]:
+                            segment_callback(seg)
+                        pending_segments[current_window[0]].clear()
+
+    if server is not None:
+        debug_print(f"Transcribing {len(windows)} chunks with whisper-server")
+        results = []
+        for idx, (w_start, w_end) in enumerate(windows):
+            results.append(_run_window(idx, w_start, w_end, None))
+            if stop_event and stop_event.is_set():
                 break
-            time.sleep(0.05)
+    elif len(windows) == 1:
+        results = [_run_window(0, start_sec, end_sec, num_threads)]
+    else:
+        # The workers share the thread budget between them
+        workers = min(max_workers, len(windows))
+        worker_threads = max(1, num_threads // workers)
+        debug_print(f"Transcribing {len(windows)} chunks with {workers} workers x {worker_threads} threads")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_run_window, idx, w_start, w_end, worker_threads)
+                for idx, (w_start, w_end) in enumerate(windows)
+            ]
+            results = [future.result() for future in futures]
 
     if progress_callback:
-        progress_callback(100, "Transcribing: 100%")
+        progress_callback(100, f"Transcribing ({backend[0]}): 100%")
 
-    raw = "".join(stdout_lines).strip()
-    segments, plain_text = [], ""
-    if raw:
-        try:
-            data = json.loads(raw)
-            segments = data.get("segments", [])
-            plain_text = " ".join(seg.get("text", "").strip() for seg in segments)
-        except json.JSONDecodeError as e:
-            debug_print(f"JSON parse error (fallback): {e}")
-            lines = raw.splitlines()
-            cleaned = [re.sub(r'^\[[^\]]+\]\s*', "", l) for l in lines if l.strip()]
-            plain_text = " ".join(cleaned)
-
-    result = {
+    if len(results) == 1:
+        raw = results[0]['raw']
+        merged_segments = results[0]['segments']
+    else:
+        merged_segments = results[0]['segments']
+        for (w_start, _), (_, prev_end), result in zip(windows[1:], windows, results[1:]):
+            merged_segments = _merge_overlap(merged_segments, result['segments'],
+                                             round(w_start * 100), round(prev_end * 100))
+        raw = _segments_to_raw(merged_segments)
+
+    segments = merged_segments
+    _strip = str.strip
+    if segments:
+        parts = [text for text in (_strip(seg['text']) for seg in segments) if text]
+    else:
+        # Output without recognisable segment lines: keep whatever text there is
+        parts = [text for text in (_strip_timestamp(line) for line in raw.splitlines()) if text]
+    plain_text = " ".join(parts)
+
+    return {
         'raw': raw,
         'text': plain_text,
         'segments': segments,
         'audio_length': audio_length,
-        'stderr': "".join(stderr_data),
-        'cancelled': bool(stop_event and stop_event.is_set()),
-        'temp_audio_path': temp_audio_path
+        'stderr': "".join(result['stderr'] for result in results),
+        'cancelled': bool(stop_event and stop_event.is_set()) or any(r['cancelled'] for r in results)
     }
 
-    try:
-        os.remove(temp_audio_path)
-    except:
-        pass
-
-    return result
-
 
 class CustomProgressBar(tk.Canvas):
     def __init__(self, master, width, height, bg_color="#E0E0E0", fill_color="#4CAF50"):
@@ -238,20 +1409,60 @@ class CustomProgressBar(tk.Canvas):
         self.coords(self.bar, 0, 0, fill_width, self.height)
         self.update_idletasks()
 
+class NotifyingQueue(queue.Queue):
+    # queue.Queue that calls notify() after every put, so the consumer can be
+    # woken up instead of polling
+    def __init__(self, notify):
+        super().__init__()
+        self._notify = notify
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        self._notify()
+
 class ConsoleRedirector:
     def __init__(self, console_queue):
         self.console_queue = console_queue
+        # Partial writes are buffered until a full line is available, or until
+        # they have waited CONSOLE_FLUSH_NS (progress output without newlines)
+        self._buffer = []
+        self._buffer_ns = 0
+        self._lock = threading.Lock()
 
     def write(self, message):
-        if message and message.strip():
-            # Queue the message for display in the UI
-            self.console_queue.put({'type': 'append', 'content': message})
-            # Also write to the original stderr for debugging in terminal
-            sys.__stderr__.write(f"REDIRECT: {message}")
-            sys.__stderr__.flush()
+        if not message:
+            return
+        with self._lock:
+            now_ns = time.monotonic_ns()
+            if not self._buffer:
+                self._buffer_ns = now_ns
+            self._buffer.append(message)
+            if '\n' not in message:
+                if now_ns - self._buffer_ns < CONSOLE_FLUSH_NS:
+                    return
+                text = "".join(self._buffer)
+                self._buffer = []
+            else:
+                text = "".join(self._buffer)
+                head, _, tail = text.rpartition('\n')
+                self._buffer = [tail] if tail else []
+                self._buffer_ns = now_ns
+                text = head + '\n'
+        self._emit(text)
 
     def flush(self):
-        pass
+        with self._lock:
+            text = "".join(self._buffer)
+            self._buffer = []
+        self._emit(text)
+
+    def _emit(self, text):
+        if text.strip():
+            # Queue the text for display in the UI
+            self.console_queue.put({'type': 'append', 'content': text})
+            # Also write to the original stderr for debugging in terminal
+            sys.__stderr__.write(f"REDIRECT: {text}")
+            sys.__stderr__.flush()
 
 class SoftWhisper:
     def __init__(self, root):
@@ -272,6 +1483,7 @@ class SoftWhisper:
         self.create_widgets()
         self.load_config()
         self.setup_callbacks()
+        self.root.after(0, self._check_ffmpeg)
         debug_print("SoftWhisper initialization complete.")
 
     def setup_variables(self):
@@ -285,9 +1497,12 @@ class SoftWhisper:
         self.start_time_var = tk.StringVar(value="00:00:00")
         self.end_time_var = tk.StringVar(value="")
         self.srt_var = tk.BooleanVar(value=False)
+        self.use_gpu_var = tk.BooleanVar(value=True)
         self.file_path = None
-        self.transcription_thread = None
-        self.model_loading_thread = None
+        # Model checks and transcriptions run one at a time on a single worker thread
+        self._job_queue = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
         self.transcription_stop_event = threading.Event()
         self.model_stop_event = threading.Event()
         self.slider_dragging = False
@@ -297,20 +1512,33 @@ class SoftWhisper:
         self.current_text = None
 
         self.WHISPER_CPP_PATH = tk.StringVar(value=get_default_whisper_cpp_path())
+        self._exec_path_cache = {}
+        self._save_pending = False
+        self._status_lock = threading.Lock()
+        self._pending_status = None
 
         # Ensure last_dir is always initialized
         self.last_dir = os.getcwd()
 
-        num_cores = psutil.cpu_count(logical=True)
-        self.num_threads = max(1, int(num_cores * 0.8))
-        debug_print(f"Using {self.num_threads} threads (logical cores * 0.8)")
+        # whisper.cpp scales poorly past the physical core count
+        self.num_threads = _physical_cores()
+        # whisper-server kept running between transcriptions, used by the worker only
+        self._server = None
+        # Models already pulled into the page cache this session
+        self._warmed_models = set()
+        # model name -> (mtime_ns, size) of the model file when it last passed the check
+        self._model_check_cache = {}
+        debug_print(f"Using {self.num_threads} threads (physical cores)")
 
     def setup_queues(self):
         debug_print("Setting up queues")
-        self.console_queue = queue.Queue()
-        self.progress_queue = queue.Queue()
-        self.transcription_queue = queue.Queue()
-        # Redirect stdout and stderr immediately and keep it redirected
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        self.console_queue = NotifyingQueue(self._schedule_drain)
+        self.progress_queue = NotifyingQueue(self._schedule_drain)
+        self.transcription_queue = NotifyingQueue(self._schedule_drain)
+        # With debug output enabled (SOFTWHISPER_DEBUG=1), redirect stdout and
+        # stderr once here and keep them redirected; by default they are left alone
         set_console_redirect(self.console_queue)
 
     def create_widgets(self):
@@ -388,6 +1616,8 @@ class SoftWhisper:
         self.console_output_box = scrolledtext.ScrolledText(console_frame, wrap="word", width=80, height=5,
                                                             state=tk.DISABLED, font=("Courier New", 10))
         self.console_output_box.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        # Lines in the console box, tracked here so trimming never has to query Tk
+        self._console_lines = 0
         console_frame.rowconfigure(0, weight=1)
         console_frame.columnconfigure(0, weight=1)
 
@@ -449,6 +1679,7 @@ class SoftWhisper:
         self.srt_checkbox.grid(row=6, column=1, sticky="w", padx=5, pady=2)
 
         # Row 7: Enable Diarization Checkbox
+        from diarization_gui import DiarizationOption
         self.diarization_option = DiarizationOption(settings_frame)
         self.diarization_option.checkbox.grid(row=7, column=1, sticky="w", padx=5, pady=2)
 
@@ -459,6 +1690,11 @@ class SoftWhisper:
         self.whisper_browse_button = tk.Button(settings_frame, text="Browse", command=self.browse_whisper_executable, font=("Arial", 10))
         self.whisper_browse_button.grid(row=8, column=2, sticky="w", padx=5, pady=5)
 
+        # Row 9: GPU offload Checkbox
+        self.gpu_checkbox = tk.Checkbutton(settings_frame, text="Use GPU (if Whisper.cpp was built with GPU support)",
+                                           variable=self.use_gpu_var, anchor="w")
+        self.gpu_checkbox.grid(row=9, column=1, sticky="w", padx=5, pady=2)
+
         # ---------------------------
         # Transcription Frame
         # ---------------------------
@@ -497,89 +1733,144 @@ class SoftWhisper:
         self.current_text = None
         self.update_status(status_message, status_color)
 
+    def _check_ffmpeg(self):
+        # All decoding goes through ffmpeg/ffprobe; tell the user up front if they are missing
+        missing = []
+        for tool in ("ffmpeg", "ffprobe"):
+            try:
+                subprocess.run([tool, "-version"], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, timeout=10, check=True)
+            except (OSError, subprocess.SubprocessError):
+                missing.append(tool)
+        if missing:
+            debug_print(f"Missing tools: {', '.join(missing)}")
+            messagebox.showerror(
+                "FFmpeg Not Found",
+                f"Could not run {' and '.join(missing)}.\n"
+                "SoftWhisper needs FFmpeg to read audio and video files. "
+                "Install it and make sure it is on your PATH."
+            )
+
     def _resolve_whisper_executable(self, path_value):
-        # Ensure executable path is absolute and points to the binary
+        # Ensure executable path is absolute and points to the binary.
+        # Results are cached per path until the user browses for a new one.
+        cached = self._exec_path_cache.get(path_value)
+        if cached is not None:
+            return cached
         exe_path = path_value
         if os.path.isdir(exe_path):
             if os.name == "nt":
                 exe_path = os.path.join(exe_path, "whisper-cli.exe")
             else:
                 exe_path = os.path.join(exe_path, "whisper-cli")
-        return os.path.abspath(exe_path)
+        exe_path = os.path.abspath(exe_path)
+        self._exec_path_cache[path_value] = exe_path
+        return exe_path
 
     def _ensure_model_file(self, selected_model, progress_queue):
         # Ensure model file exists, download if allowed and missing
         model_filename = f"ggml-{selected_model}.bin"
-        model_path = os.path.join("models", "whisper", model_filename)
+        model_path = _model_path(selected_model)
         debug_print(f"Looking for model file: {model_path}")
-        if not os.path.exists(model_path):
+        try:
+            st = os.stat(model_path)
+        except OSError:
+            st = None
+        # Already checked this session and unchanged since: nothing to do
+        if st is not None and self._model_check_cache.get(selected_model) == (st.st_mtime_ns, st.st_size):
+            return model_path
+        if st is not None and not _model_is_valid(
+                model_path, lambda: progress_queue.put((0, f"Verifying {model_filename}..."))):
+            # Only downloads are held to MODEL_SHA1. A file that was already
+            # here may be a newer upstream release or the user's own build, so
+            # it is kept and used; if it is corrupt, whisper.cpp will say so.
+            debug_print(f"Model file {model_path} does not match the published checksum; using it anyway")
+            self.console_queue.put({'type': 'append', 'content':
+                f"Warning: {model_filename} does not match the published checksum. "
+                f"If loading it fails, delete it to download it again.\n"})
+        if st is None:
             if model_filename in ALLOWED_MODELS:
                 debug_print(f"Model file not found, attempting download for {model_filename}...")
-                whisper_folder = os.path.join("models", "whisper")
-                if not os.path.exists(whisper_folder):
-                    os.makedirs(whisper_folder)
+                os.makedirs(MODEL_DIR, exist_ok=True)
                 url = f"https://huggingface.co/ggerganov/whisper.cpp/resolve/main/{model_filename}"
                 debug_print(f"Downloading model from {url}")
 
-                def download_reporthook(block_num, block_size, total_size):
-                    downloaded = block_num * block_size
-                    percentage = int(downloaded / total_size * 100) if total_size > 0 else 0
+                def download_report(downloaded, total_size):
+                    percentage = min(100, int(downloaded / total_size * 100)) if total_size > 0 else 0
                     progress_message = f"Downloading {model_filename}: {percentage}%"
                     progress_queue.put((percentage, progress_message))
 
-                urllib.request.urlretrieve(url, model_path, reporthook=download_reporthook)
+                _download_model(url, model_path, download_report)
                 debug_print("Download successful.")
                 progress_queue.put((100, f"Download of {model_filename} complete"))
             else:
                 raise Exception(f"Model file {model_path} not found and automatic download is not supported for this model.")
+            st = os.stat(model_path)
+        self._model_check_cache[selected_model] = (st.st_mtime_ns, st.st_size)
         return model_path
 
-    def _format_and_display_transcription(self, result):
-        # Format and display transcription based on options and diarization
-        if self.transcription_stop_event.is_set() or result.get('cancelled', False):
+    def _result_to_srt(self, result):
+        # Build SRT from the parsed segments; fall back to re-parsing the raw text
+        segments = result.get('segments')
+        if segments:
+            return segments_to_srt(segments)
+        return whisper_to_srt(result.get('raw', ''))
+
+    def _format_and_display_transcription(self, result, options, file_path, stop_event):
+        # Format and display transcription based on options and diarization.
+        # Runs on the worker thread, so it only reads the options snapshot.
+        if stop_event.is_set() or result.get('cancelled', False):
             return
 
         raw_output = result.get('raw', '')
 
-        if hasattr(self, 'diarization_option') and self.diarization_option.is_enabled():
-            self.current_text = raw_output
+        if options.get('diarize'):
             debug_print("Converting to SRT format for diarization")
-            srt_content = whisper_to_srt(self.current_text)
+            srt_content = self._result_to_srt(result)
             from diarization_gui import merge_diarization
 
             def diarization_progress_callback(progress, message):
-                if self.transcription_stop_event.is_set():
+                if stop_event.is_set():
                     return
                 self.progress_queue.put((progress, message))
 
-            diarized_text = merge_diarization(
-                self.file_path,
+            future = options.get('diarization_future')
+            if future is not None and not future.done():
+                self.progress_queue.put((0, "Waiting for speaker identification..."))
+            try:
+                diarization_segments = future.result() if future is not None else None
+            except Exception:
+                if stop_event.is_set():
+                    # Stopped while waiting; the diarization was cancelled with the job
+                    self.update_status("Transcription cancelled by user.", "red")
+                    return
+                raise
+            text = merge_diarization(
+                file_path,
                 srt_content,
-                remove_timestamps=not self.srt_var.get(),
-                progress_callback=diarization_progress_callback
+                remove_timestamps=not options.get('generate_srt'),
+                progress_callback=diarization_progress_callback,
+                diarization_segments=diarization_segments
             )
-            self.current_text = diarized_text
-            self.display_transcription(diarized_text)
-        elif self.srt_var.get():
-            self.current_text = raw_output
+        elif options.get('generate_srt'):
             debug_print("Converting to proper SRT format for display")
-            srt_content = whisper_to_srt(self.current_text)
-            self.current_text = srt_content
-            self.display_transcription(srt_content)
+            text = self._result_to_srt(result)
         else:
-            lines = raw_output.splitlines()
-            plain_lines = [re.sub(r'^\[[^\]]+\]\s*', '', line) for line in lines if line.strip()]
-            plain_text = " ".join(plain_lines)
-            self.current_text = plain_text
-            self.display_transcription(plain_text)
-
-        self.current_segments = result.get('segments', [])
-        if len(self.current_text.strip()) > 0:
-            self.export_button.config(state=tk.NORMAL)
+            text = result.get('text', '')
+
+        self.display_transcription(text)
+        # Hand the result to the Tk thread, which owns current_text/current_segments
+        self.root.after(0, self._publish_result, text, result.get('segments', []))
 
         self.update_status("Transcription completed.", "green")
         self.console_queue.put({'type': 'append', 'content': "Transcription process complete.\n"})
 
+    def _publish_result(self, text, segments):
+        self.current_text = text
+        self.current_segments = segments
+        if len(text.strip()) > 0:
+            self.export_button.config(state=tk.NORMAL)
+
     def browse_whisper_executable(self):
         current_path = self.WHISPER_CPP_PATH.get()
         init_dir = os.path.dirname(current_path) if current_path else os.getcwd()
@@ -588,7 +1879,9 @@ class SoftWhisper:
             initialdir=init_dir,
             filetypes=[("Executable Files", "*.exe" if os.name == "nt" else "*.*")]
         )
+        self._drain_queues()
         if file_path:
+            self._exec_path_cache.clear()
             self.WHISPER_CPP_PATH.set(file_path)
             debug_print(f"User selected Whisper.cpp executable: {file_path}")
 
@@ -596,14 +1889,17 @@ class SoftWhisper:
         debug_print("Loading configuration")
         if os.path.exists(CONFIG_FILE):
             try:
-                with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
+                with open(CONFIG_FILE, 'rb') as f:
+                    config = _json_loads(f.read())
                 # Restore beam size
                 self.beam_size_var.set(config.get('beam_size', 5))
+                # Restore GPU preference
+                self.use_gpu_var.set(config.get('use_gpu', True))
                 # Restore Whisper path
                 self.WHISPER_CPP_PATH.set(config.get('WHISPER_CPP_PATH', get_default_whisper_cpp_path()))
                 # Restore last‑opened folder (fallback to already-set self.last_dir)
                 self.last_dir = config.get('last_dir', self.last_dir)
+                _prewarm_dir(self.last_dir)
                 debug_print(f"Configuration loaded: {config}")
             except Exception as e:
                 debug_print(f"Error loading config: {e}")
@@ -611,8 +1907,18 @@ class SoftWhisper:
             debug_print("No configuration file found; using defaults.")
 
     def save_config(self, *args, **kwargs):
+        # Bursts of changes (spinbox clicks, repeated file selections) are
+        # coalesced into a single write
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self.root.after(CONFIG_SAVE_DELAY_MS, self._write_config)
+
+    def _write_config(self):
+        self._save_pending = False
         config = {
             'beam_size': self.beam_size_var.get(),
+            'use_gpu': self.use_gpu_var.get(),
             'WHISPER_CPP_PATH': self.WHISPER_CPP_PATH.get(),
             'last_dir': self.last_dir
         }
@@ -626,15 +1932,47 @@ class SoftWhisper:
         debug_print("Setting up callbacks")
         self.model_var.trace("w", self.save_config)
         self.beam_size_var.trace("w", self.save_config)
+        self.use_gpu_var.trace("w", self.save_config)
         self.check_queues()
 
-    def load_model(self):
+    def _worker_loop(self):
+        # Run queued jobs until the None sentinel arrives
+        while True:
+            job = self._job_queue.get()
+            if job is None:
+                break
+            func, args = job
+            try:
+                func(*args)
+            except Exception as e:
+                debug_print(f"Worker job {func.__name__} failed: {e}")
+
+    def _submit(self, func, *args):
+        self._job_queue.put((func, args))
+
+    def load_model(self, selected_model=None):
         debug_print("Entering load_model()")
-        selected_model = self.model_var.get()
+        if selected_model is None:
+            selected_model = self.model_var.get()
         try:
             self.progress_queue.put((0, f"Checking model '{selected_model}'..."))
             # Ensure model file exists (and download if necessary)
-            self._ensure_model_file(selected_model, self.progress_queue)
+            model_path = self._ensure_model_file(selected_model, self.progress_queue)
+            if selected_model not in self._warmed_models:
+                self._warmed_models.add(selected_model)
+                _prewarm_model(model_path)
+            # whisper-server is started by the first transcription that uses it,
+            # not at launch. Once one is in use, switching models reloads it
+            # here, so the next transcription does not wait for the model.
+            if self._server is not None and self._server.key[1] != model_path:
+                exe, _, threads, use_gpu = self._server.key
+                self._server.close()
+                self._server = None
+                self.progress_queue.put((50, f"Loading '{selected_model}' into whisper-server..."))
+                try:
+                    self._server = WhisperServer(exe, model_path, threads, use_gpu)
+                except (OSError, RuntimeError) as e:
+                    debug_print(f"whisper-server unavailable, using whisper-cli: {e}")
             self.model_loaded = True
             self.previous_model = selected_model
             self.progress_queue.put((100, f"Model '{selected_model}' is ready (Whisper.cpp)"))
@@ -643,8 +1981,8 @@ class SoftWhisper:
         except Exception as e:
             self.progress_queue.put((0, f"Error: {str(e)}"))
             self.console_queue.put({'type': 'append', 'content': f"Error loading model: {str(e)}\n"})
-            messagebox.showerror("Model Loading Error", f"Failed to load model '{selected_model}'.\nError: {str(e)}")
-            self.model_var.set(self.previous_model if hasattr(self, 'previous_model') else "base")
+            self.root.after(0, messagebox.showerror, "Model Loading Error", f"Failed to load model '{selected_model}'.\nError: {str(e)}")
+            self.root.after(0, self.model_var.set, self.previous_model if hasattr(self, 'previous_model') else "base")
             self.root.after(0, self.enable_buttons)
             debug_print("load_model() encountered an error.")
 
@@ -658,16 +1996,13 @@ class SoftWhisper:
                 self.model_loaded = False
                 self._reset_for_new_operation("Checking selected Whisper.cpp model...", "blue")
                 self.disable_buttons()
-                self.transcription_stop_event.clear()
-                self.model_loading_thread = threading.Thread(target=self.load_model, daemon=True)
-                self.model_loading_thread.start()
+                self._submit(self.load_model, self.model_var.get())
             else:
                 self.model_var.set(self.previous_model)
         elif not self.model_loaded:
             self.update_status("Checking selected Whisper.cpp model...", "blue")
             self.disable_buttons()
-            self.model_loading_thread = threading.Thread(target=self.load_model, daemon=True)
-            self.model_loading_thread.start()
+            self._submit(self.load_model, self.model_var.get())
 
     def select_file(self):
         debug_print("User requested file selection")
@@ -679,10 +2014,13 @@ class SoftWhisper:
             filetypes=[("Audio/Video Files", "*.wav *.mp3 *.m4a *.flac *.ogg *.wma *.mp4 *.mov *.avi *.mkv"), ("All Files", "*.*")],
             multiple=False
         )
+        # The modal dialog may have held up queued progress/console updates
+        self._drain_queues()
         
         if file_path:
             self.last_dir = os.path.dirname(file_path)
             self.save_config()
+            _prewarm_dir(self.last_dir)
 
             self.file_path = file_path
             filename = os.path.basename(file_path)
@@ -701,13 +2039,11 @@ class SoftWhisper:
             if self.model_loaded:
                 self.start_button.config(state=tk.NORMAL)
 
-            self.root.update_idletasks()
             self.media_player_ui.load_media(file_path)
 
             self.play_button.config(state=tk.NORMAL)
             self.pause_button.config(state=tk.NORMAL)
             self.stop_media_button.config(state=tk.NORMAL)
-            self.root.update_idletasks()
         else:
             # Do NOT reset self.file_path if no new file is selected.
             debug_print("No file selected, keeping previous file.")
@@ -724,99 +2060,145 @@ class SoftWhisper:
         self.disable_buttons()
         self.stop_button.config(state=tk.NORMAL)
         self._reset_for_new_operation("Preparing for transcription...", "orange")
-        self.transcription_stop_event.clear()
+        # A fresh event per job: clearing a shared one could revive a cancelled job
+        self.transcription_stop_event = threading.Event()
+
+        # Tk variables are read here, on the Tk thread; the worker only sees the snapshot
+        self._submit(self.transcribe_file, self.file_path, self._collect_options(),
+                     self.transcription_stop_event)
+        debug_print("Transcription job queued.")
 
-        self.transcription_thread = threading.Thread(target=self.transcribe_file, args=(self.file_path,), daemon=True)
-        self.transcription_thread.start()
-        debug_print("Transcription thread started.")
+    def _collect_options(self):
+        lang = self.language_var.get().strip().lower() or "auto"
+        return {
+            'model_name': self.model_var.get(),
+            'model_path': _model_path(self.model_var.get()),
+            'task': self.task_var.get(),
+            'language': lang,
+            'beam_size': self.beam_size_var.get(),
+            'start_time': self.start_time_var.get().strip(),
+            'end_time': self.end_time_var.get().strip(),
+            'num_threads': self.num_threads,
+            'use_gpu': self.use_gpu_var.get(),
+            'generate_srt': self.srt_var.get(),
+            'diarize': hasattr(self, 'diarization_option') and self.diarization_option.is_enabled(),
+            'parent_window': self.root,
+            'whisper_executable': self.WHISPER_CPP_PATH.get()
+        }
 
     def stop_processing(self):
         debug_print("Stop transcription requested")
         self.transcription_stop_event.set()
         self.update_status("Stopping transcription...", "red")
         self.stop_button.config(state=tk.DISABLED)
-        self.root.after(0, self.enable_buttons)
+        # The buttons come back when the worker has actually wound the job down
 
-    def transcribe_file(self, file_path: str):
+    # Returns a running WhisperServer for these options, restarting it when the
+    # model, threads or backend changed; None means use whisper-cli
+    def _get_server(self, options):
+        exe = _server_executable(options['whisper_executable'])
+        if exe is None:
+            return None
+        key = (exe, options['model_path'], self.num_threads, options.get('use_gpu', True))
+        if self._server is not None and (self._server.key != key or not self._server.alive()):
+            self._server.close()
+            self._server = None
+        if self._server is None:
+            self.update_status("Loading model into whisper-server...", "orange")
+            try:
+                self._server = WhisperServer(*key)
+            except (OSError, RuntimeError) as e:
+                debug_print(f"whisper-server unavailable, using whisper-cli: {e}")
+                return None
+        return self._server
+
+    # stop_event is this job's own cancel token, so a later job never revives it
+    def transcribe_file(self, file_path: str, options: dict, stop_event: threading.Event):
         debug_print(f"transcribe_file() => {file_path}")
-        set_console_redirect(self.console_queue)
 
         try:
-            lang = self.language_var.get().strip().lower() or "auto"
-            debug_print(f"Language setting: '{lang}'")
-
-            options = {
-                'model_name': self.model_var.get(),
-                'task': self.task_var.get(),
-                'language': lang,
-                'beam_size': self.beam_size_var.get(),
-                'start_time': self.start_time_var.get().strip(),
-                'end_time': self.end_time_var.get().strip(),
-                'generate_srt': self.srt_var.get(),
-                'parent_window': self.root,
-                'whisper_executable': self.WHISPER_CPP_PATH.get()
-            }
+            options = dict(options)
+            debug_print(f"Language setting: '{options['language']}'")
 
             # Resolve executable path
             executable_abs = self._resolve_whisper_executable(options['whisper_executable'])
             options['whisper_executable'] = executable_abs
             debug_print(f"Using Whisper executable: {executable_abs}")
+            # transcribe_audio asks for the server only when its windows run one
+            # after another, so it is not started for parallel runs
+            options['whisper_server'] = functools.partial(self._get_server, options)
 
             # Absolute path for the input file
             file_path = os.path.abspath(file_path)
 
-            # Build a rough command template for debugging purposes
-            model_abs = os.path.abspath(os.path.join("models", "whisper", f"ggml-{options['model_name']}.bin"))
-            whisper_cmd = f"{executable_abs} -m {model_abs} -f {file_path} -l {options['language']} -bs {options['beam_size']}"
-            if options['task'] == 'translate':
-                whisper_cmd += " -translate"
-            whisper_cmd += " -oj"
-            debug_print(f"Command template: {whisper_cmd}")
+            # Diarization only needs the audio, so it runs alongside whisper.cpp.
+            # It shares the job's stop event, which is also set if the job fails.
+            if options.get('diarize') and not stop_event.is_set():
+                from diarization_gui import run_diarization
+                options['diarization_future'] = _run_in_background(run_diarization, file_path, stop_event)
+
+            # Define callbacks for progress and status updates. The chunk
+            # workers report concurrently, so the rate-limit state is per job
+            # and checked and updated under one lock.
+            last_sent = [None, 0]  # last update queued, and when (monotonic ns)
+            progress_lock = threading.Lock()
 
-            # Define callbacks for progress and status updates
             def progress_callback(progress, message):
-                if self.transcription_stop_event.is_set():
+                if stop_event.is_set():
                     return
-                self.progress_queue.put((progress, message))
+                # Only changes reach the UI, at most ~30 per second; the final one always does
+                update = (int(progress), message)
+                with progress_lock:
+                    if update == last_sent[0]:
+                        return
+                    now_ns = time.monotonic_ns()
+                    if progress < 100 and now_ns - last_sent[1] < UI_UPDATE_INTERVAL_NS:
+                        return
+                    last_sent[0] = update
+                    last_sent[1] = now_ns
+                    self.progress_queue.put(update)
 
             def status_callback(message, color):
                 self.update_status(message, color)
 
+            def segment_callback(seg):
+                # Show segments as they arrive; the final text replaces them
+                if stop_event.is_set():
+                    return
+                self.transcription_queue.put({'type': 'segment', 'text': _segments_to_raw([seg]) + "\n"})
+
             debug_print("Calling transcribe_audio()...")
-            if not self.transcription_stop_event.is_set():
+            if not stop_event.is_set():
                 result = transcribe_audio(
                     file_path=file_path,
                     options=options,
                     progress_callback=progress_callback,
                     status_callback=status_callback,
-                    stop_event=self.transcription_stop_event
+                    stop_event=stop_event,
+                    segment_callback=segment_callback
                 )
                 debug_print("Transcription completed or cancelled")
 
-                if (not self.transcription_stop_event.is_set()) and not result.get('cancelled', False):
-                    self._format_and_display_transcription(result)
+                if (not stop_event.is_set()) and not result.get('cancelled', False):
+                    self._format_and_display_transcription(result, options, file_path, stop_event)
                 elif result.get('cancelled', False):
                     self.update_status("Transcription cancelled by user.", "red")
                 else:
                     self.update_status("Transcription aborted.", "red")
-
-                if result.get('temp_audio_path') and os.path.exists(result['temp_audio_path']):
-                    try:
-                        os.remove(result['temp_audio_path'])
-                    except Exception:
-                        pass
             else:
                 self.update_status("Transcription aborted.", "red")
         except Exception as e:
             import traceback
+            # Nothing will use a diarization still running in the background
+            stop_event.set()
             error_msg = str(e)
             stack_trace = traceback.format_exc()
             self.console_queue.put({'type': 'append', 'content': f"Error during transcription: {error_msg}\n{stack_trace}\n"})
             self.progress_queue.put((0, f"Error during transcription: {error_msg}"))
-            messagebox.showerror("Transcription Error", f"Failed to transcribe the audio/video file.\nError: {error_msg}")
+            self.root.after(0, messagebox.showerror, "Transcription Error", f"Failed to transcribe the audio/video file.\nError: {error_msg}")
             debug_print(f"Transcription error: {error_msg}")
         finally:
-            self.root.after(100, self.enable_buttons)
+            self.root.after(0, self.enable_buttons)
 
     def disable_buttons(self):
         self._set_buttons_state(
@@ -824,73 +2206,144 @@ class SoftWhisper:
         )
 
     def enable_buttons(self):
+        ready = bool(self.file_path and self.model_loaded)
         self._set_buttons_state(
-            select=True,
-            start=bool(self.file_path and self.model_loaded),
-            stop=False,
-            play=bool(self.file_path and self.model_loaded),
-            pause=bool(self.file_path and self.model_loaded),
-            stop_media=bool(self.file_path and self.model_loaded)
+            select=True, start=ready, stop=False, play=ready, pause=ready, stop_media=ready
         )
 
     def update_status(self, message, color):
-        def update():
-            self.status_label.config(text=message, fg=color)
-        self.root.after(0, update)
+        # May be called from any thread; a burst of updates costs one Tk callback
+        # and only the newest status is shown
+        with self._status_lock:
+            scheduled = self._pending_status is not None
+            self._pending_status = (message, color)
+        if not scheduled:
+            self.root.after_idle(self._apply_pending_status)
+
+    def _apply_pending_status(self):
+        with self._status_lock:
+            pending, self._pending_status = self._pending_status, None
+        if pending is not None:
+            self._apply_status(*pending)
+
+    def _apply_status(self, message, color):
+        self.status_label.config(text=message, fg=color)
+
+    def _schedule_drain(self):
+        # Called by the queues on put (from any thread); one pending drain is enough
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        try:
+            self.root.after_idle(self._drain_queues)
+        except (RuntimeError, tk.TclError):
+            # Interpreter not running or already destroyed
+            with self._drain_lock:
+                self._drain_scheduled = False
 
     def check_queues(self):
+        # Fallback timer in case a wake-up was missed
+        self._drain_queues()
+        self.root.after(QUEUE_FALLBACK_MS, self.check_queues)
+
+    def _drain_queues(self):
+        with self._drain_lock:
+            self._drain_scheduled = False
+
         # Flag to determine if we need to update the UI
         needs_update = False
 
-        # Process progress queue
+        # Process progress queue; only the latest update is drawn
+        latest = None
         try:
             while True:
-                progress, status_message = self.progress_queue.get_nowait()
-                self.progress_bar.set_progress(progress)
-                if status_message:
-                    self.update_status(status_message, "blue")
-                needs_update = True
+                latest = self.progress_queue.get_nowait()
         except queue.Empty:
             pass
+        if latest is not None:
+            progress, status_message = latest
+            self.progress_bar.set_progress(progress)
+            if status_message:
+                self._apply_status(status_message, "blue")
+            needs_update = True
 
         # Process console queue
-        try:
-            while True:
-                message_data = self.console_queue.get_nowait()
-                self.console_output_box.config(state=tk.NORMAL)
+        if self._drain_console():
+            needs_update = True
 
-                if message_data['type'] == 'append':
-                    self.console_output_box.insert(tk.END, message_data['content'])
-                    if float(self.console_output_box.index(tk.END)) > 1000:
-                        self.console_output_box.delete(1.0, "end-500l")
-                    self.console_output_box.see(tk.END)
-                elif message_data['type'] == 'clear':
-                    self.console_output_box.delete(1.0, tk.END)
+        # Process transcription queue
+        if self._drain_transcription():
+            needs_update = True
 
-                self.console_output_box.config(state=tk.DISABLED)
-                needs_update = True
+        # Force an update if needed
+        if needs_update:
+            self.root.update_idletasks()
+
+    def _drain_transcription(self):
+        # Collapse pending transcription actions into at most one delete and one insert
+        parts = []
+        replace = False
+        streamed = False
+        try:
+            while True:
+                action = self.transcription_queue.get_nowait()
+                if action['type'] in ('set_text', 'clear'):
+                    # Replaces whatever was queued before it
+                    parts = [action['text']] if action['type'] == 'set_text' else []
+                    replace = True
+                    streamed = False
+                elif action['type'] == 'segment':
+                    parts.append(action['text'])
+                    streamed = True
         except queue.Empty:
             pass
 
-        # Process transcription queue
+        if not parts and not replace:
+            return False
+
+        if replace:
+            self.transcription_box.delete(1.0, tk.END)
+        if parts:
+            self.transcription_box.insert(tk.END, "".join(parts))
+        if streamed:
+            self.transcription_box.see(tk.END)
+        return True
+
+    def _drain_console(self):
+        # Apply every pending console message with a single insert
+        appends = []
+        clear = False
         try:
             while True:
-                action = self.transcription_queue.get_nowait()
-                if action['type'] == 'set_text':
-                    self.transcription_box.delete(1.0, tk.END)
-                    self.transcription_box.insert(tk.END, action['text'])
-                elif action['type'] == 'clear':
-                    self.transcription_box.delete(1.0, tk.END)
-                needs_update = True
+                message_data = self.console_queue.get_nowait()
+                if message_data['type'] == 'append':
+                    appends.append(message_data['content'])
+                elif message_data['type'] == 'clear':
+                    # Anything queued before the clear would be deleted anyway
+                    appends.clear()
+                    clear = True
         except queue.Empty:
             pass
 
-        # Force an update if needed
-        if needs_update:
-            self.root.update_idletasks()
+        if not appends and not clear:
+            return False
 
-        # Schedule the next check
-        self.root.after(50, self.check_queues)
+        self.console_output_box.config(state=tk.NORMAL)
+        if clear:
+            self.console_output_box.delete(1.0, tk.END)
+            self._console_lines = 0
+        if appends:
+            text = "".join(appends)
+            self.console_output_box.insert(tk.END, text)
+            self._console_lines += text.count("\n")
+            if self._console_lines > CONSOLE_MAX_LINES:
+                excess = self._console_lines - CONSOLE_KEEP_LINES
+                self.console_output_box.delete(1.0, f"{excess + 1}.0")
+                self._console_lines = CONSOLE_KEEP_LINES
+            self.console_output_box.see(tk.END)
+        self.console_output_box.config(state=tk.DISABLED)
+        return True
 
     def clear_transcription_box(self):
         # Queue a request to clear the transcription textbox
@@ -901,6 +2354,7 @@ class SoftWhisper:
         self.console_output_box.config(state=tk.NORMAL)
         self.console_output_box.delete(1.0, tk.END)
         self.console_output_box.config(state=tk.DISABLED)
+        self._console_lines = 0
 
     def display_transcription(self, text):
         # Queue transcription text to be displayed in the textbox
@@ -918,10 +2372,28 @@ class SoftWhisper:
     def on_closing(self):
         debug_print("Closing application")
         self.transcription_stop_event.set()
-        if self.transcription_thread and self.transcription_thread.is_alive():
-            self.transcription_thread.join()
+        # A request in flight only returns once the server is gone
+        if self._server is not None:
+            self._server.close()
+        # Drop jobs that have not started, then let the worker finish the current one
+        try:
+            while True:
+                self._job_queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._job_queue.put(None)
+        # Wait in short steps while still servicing Tk events: the worker may be
+        # blocked on a root.after() call that only the main loop can complete
+        deadline = time.monotonic() + 10
+        while self._worker.is_alive() and time.monotonic() < deadline:
+            self.root.update()
+            self._worker.join(0.05)
+        if self._save_pending:
+            self._write_config()
         if hasattr(self, 'media_player_ui'):
             self.media_player_ui.cleanup()
+        _clear_shm_pcm_cache()
+        restore_console()
         self.root.destroy()
 
 if __name__ == "__main__":
@@ -929,7 +2401,6 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = SoftWhisper(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    app.load_model()
-    app.check_queues()
+    app._submit(app.load_model, app.model_var.get())
     debug_print("Entering mainloop")
     root.mainloop()
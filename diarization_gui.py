@@ -12,13 +12,26 @@ by the diarization process. This module uses the APIs from diarizer_core_types.p
 and speaker_tagger.py.
 """
 
+import hashlib
+import io
+import json
+import os
 import re
+from dataclasses import dataclass
 from pathlib import Path
 import tkinter as tk
 from tkinter import BooleanVar, Checkbutton
 
-import speaker_tagger  # API for speaker segmentation and clustering
-import diarizer_core_types  # Core types for transcription and subtitles (if needed)
+# speaker_tagger (librosa, scikit-learn, inaSpeechSegmenter) is imported in
+# merge_diarization, so showing the checkbox does not load those packages.
+
+# Diarization results are cached per audio file. Bump DIARIZATION_CACHE_VERSION
+# whenever speaker_tagger's output changes so stale entries are ignored.
+DIARIZATION_CACHE_DIR = Path.home() / ".cache" / "softwhisper" / "diar"
+DIARIZATION_CACHE_VERSION = 2
+FINGERPRINT_BLOCK = 1 << 20
+
+_SRT_TIMESTAMP_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})')
 
 
 class DiarizationOption:
@@ -40,6 +53,73 @@ class DiarizationOption:
         return self.var.get()
 
 
+@dataclass
+class DiarizationSegments:
+    """
+    Diarization result in column form, sorted by start time: NumPy arrays
+    for the numeric fields and plain lists for the two string fields. This is
+    what run_diarization returns and what the diarization cache stores.
+
+    Iterating yields the legacy (start, end, speaker_number, gender,
+    orig_label) tuples.
+    """
+    starts: object
+    ends: object
+    speakers: object
+    genders: list
+    labels: list
+
+    @classmethod
+    def from_tuples(cls, segments):
+        """
+        Builds the column form from (start, end, speaker_number, gender, orig_label) tuples.
+        """
+        import numpy as np
+        segments = sorted(segments, key=lambda seg: seg[0])
+        count = len(segments)
+        return cls(
+            starts=np.fromiter((seg[0] for seg in segments), dtype=np.float64, count=count),
+            ends=np.fromiter((seg[1] for seg in segments), dtype=np.float64, count=count),
+            speakers=np.fromiter((seg[2] for seg in segments), dtype=np.int32, count=count),
+            genders=[seg[3] for seg in segments],
+            labels=[seg[4] for seg in segments],
+        )
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Builds the column form from the dict written by to_columns.
+        """
+        import numpy as np
+        return cls(
+            starts=np.asarray(columns["starts"], dtype=np.float64),
+            ends=np.asarray(columns["ends"], dtype=np.float64),
+            speakers=np.asarray(columns["speakers"], dtype=np.int32),
+            genders=list(columns["genders"]),
+            labels=list(columns["labels"]),
+        )
+
+    def to_columns(self):
+        """
+        Returns the columns as a JSON-serialisable dict of lists.
+        """
+        return {
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "speakers": self.speakers.tolist(),
+            "genders": self.genders,
+            "labels": self.labels,
+        }
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        for start, end, speaker, gender, label in zip(self.starts.tolist(), self.ends.tolist(),
+                                                      self.speakers.tolist(), self.genders, self.labels):
+            yield (start, end, speaker, gender, label)
+
+
 def srt_time_to_seconds(time_str):
     """
     Converts an SRT time string of format "hh:mm:ss,ms" to seconds.
@@ -65,32 +145,114 @@ def parse_srt(srt_content):
       - text: subtitle text
     """
     entries = []
-    # Split entries by blank lines.
-    blocks = re.split(r'\n\s*\n', srt_content.strip())
-    for block in blocks:
-        lines = block.splitlines()
-        if len(lines) >= 3:
-            index = lines[0].strip()
-            timestamp_line = lines[1].strip()
-            text = "\n".join(lines[2:]).strip()
+    block = []
+    # Single pass over the lines; a blank line closes the current block.
+    # The trailing "" flushes the last block.
+    for line in srt_content.splitlines() + [""]:
+        if line.strip():
+            block.append(line)
+            continue
+        if len(block) >= 3:
             # Extract start and end times (format: hh:mm:ss,ms --> hh:mm:ss,ms)
-            match = re.match(r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', timestamp_line)
+            match = _SRT_TIMESTAMP_RE.match(block[1].strip())
             if match:
-                start_str, end_str = match.groups()
-                start_sec = srt_time_to_seconds(start_str)
-                end_sec = srt_time_to_seconds(end_str)
+                h1, m1, s1, ms1, h2, m2, s2, ms2 = match.groups()
                 entries.append({
-                    'index': index,
-                    'start_str': start_str,
-                    'end_str': end_str,
-                    'start': start_sec,
-                    'end': end_sec,
-                    'text': text
+                    'index': block[0].strip(),
+                    'start_str': f"{h1}:{m1}:{s1},{ms1}",
+                    'end_str': f"{h2}:{m2}:{s2},{ms2}",
+                    'start': int(h1) * 3600 + int(m1) * 60 + int(s1) + int(ms1) / 1000.0,
+                    'end': int(h2) * 3600 + int(m2) * 60 + int(s2) + int(ms2) / 1000.0,
+                    'text': "\n".join(block[2:]).strip()
                 })
+        block = []
     return entries
 
 
-def merge_diarization(file_path, srt_content, remove_timestamps=False, progress_callback=None):
+def audio_fingerprint(file_path):
+    """
+    Returns a quick content fingerprint of an audio file: SHA-256 over its
+    size and its first and last MiB, so large files are not read in full.
+    """
+    h = hashlib.sha256()
+    size = os.path.getsize(file_path)
+    h.update(str(size).encode("ascii"))
+    with open(file_path, "rb") as f:
+        h.update(f.read(FINGERPRINT_BLOCK))
+        if size > 2 * FINGERPRINT_BLOCK:
+            f.seek(-FINGERPRINT_BLOCK, os.SEEK_END)
+            h.update(f.read(FINGERPRINT_BLOCK))
+    return h.hexdigest()
+
+
+def load_cached_diarization(fingerprint):
+    """
+    Returns the cached DiarizationSegments for a fingerprint, or None.
+    """
+    try:
+        with open(DIARIZATION_CACHE_DIR / f"{fingerprint}.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != DIARIZATION_CACHE_VERSION:
+        return None
+    try:
+        return DiarizationSegments.from_columns(data["segments"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def store_cached_diarization(fingerprint, segments):
+    """
+    Writes DiarizationSegments to the cache atomically; failures are ignored.
+    """
+    path = DIARIZATION_CACHE_DIR / f"{fingerprint}.json"
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        DIARIZATION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": DIARIZATION_CACHE_VERSION, "segments": segments.to_columns()}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def run_diarization(file_path, stop_event=None):
+    """
+    Returns the diarization segments for an audio file as DiarizationSegments,
+    from the cache when possible, otherwise by running the speaker tagger.
+
+    Safe to call from a worker thread, so it can run alongside transcription.
+    Setting stop_event (a threading.Event) abandons the run, which then
+    raises speaker_tagger.DiarizationCancelled; a failed run raises
+    speaker_tagger.DiarizationError.
+    """
+    try:
+        fingerprint = audio_fingerprint(file_path)
+    except OSError:
+        fingerprint = None
+    diarization_segments = load_cached_diarization(fingerprint) if fingerprint else None
+    if diarization_segments is None:
+        import speaker_tagger
+        tagger = speaker_tagger.SpeakerTagger()
+        # The segmenter and the embedding decoder both read the cached
+        # 16 kHz extraction, so neither decodes the original media
+        try:
+            audio_path = speaker_tagger.extract_audio(Path(file_path))
+        except OSError:
+            # Cache folder not writable; decode the original instead
+            audio_path = Path(file_path)
+        diarization_segments = DiarizationSegments.from_tuples(tagger.process_audio(audio_path, stop_event))
+        if fingerprint:
+            store_cached_diarization(fingerprint, diarization_segments)
+    return diarization_segments
+
+
+def merge_diarization(file_path, srt_content, remove_timestamps=False, progress_callback=None,
+                      diarization_segments=None):
     """
     Processes diarization on the provided audio file and merges speaker information into the given SRT content.
     
@@ -101,6 +263,8 @@ def merge_diarization(file_path, srt_content, remove_timestamps=False, progress_
                                   If False, the original SRT formatting (segment numbers and timestamps) is preserved.
         progress_callback (callable, optional): A function to report progress updates. It should accept two parameters:
             progress (int) and message (str).
+        diarization_segments (DiarizationSegments, optional): Segments already computed by run_diarization
+            (e.g. in parallel with transcription). When omitted, diarization runs here.
     
     Returns:
         str: The merged output with speaker labels.
@@ -112,10 +276,8 @@ def merge_diarization(file_path, srt_content, remove_timestamps=False, progress_
     if progress_callback:
         progress_callback(0, "Starting diarization merge...")
     
-    # Obtain diarization segments using the speaker tagger.
-    import speaker_tagger
-    tagger = speaker_tagger.SpeakerTagger()
-    diarization_segments = tagger.process_audio(Path(file_path))
+    if diarization_segments is None:
+        diarization_segments = run_diarization(file_path)
     if progress_callback:
         progress_callback(30, "Diarization segmentation complete.")
     
@@ -125,40 +287,47 @@ def merge_diarization(file_path, srt_content, remove_timestamps=False, progress_
         progress_callback(50, "Parsed SRT entries.")
     
     # For each SRT entry, determine the corresponding speaker segment and prepend the speaker label.
-    merged_entries = []
-    for entry in srt_entries:
-        speaker_label = "[Speaker Unknown]: "
-        # Each diarization segment is expected to be a tuple:
-        # (start, end, speaker_number, gender, orig_label)
-        for seg in diarization_segments:
-            seg_start, seg_end, speaker_num, gender, orig_label = seg
-            if seg_start <= entry['start'] < seg_end:
-                speaker_label = f"[Speaker {speaker_num}]: "
-                break
-        new_text = f"{speaker_label}{entry['text']}"
-        # Only include timestamps if remove_timestamps is False.
-        timestamp_line = f"{entry['start_str']} --> {entry['end_str']}" if not remove_timestamps else ""
-        merged_entries.append({
-            'index': entry['index'],
-            'timestamp': timestamp_line,
-            'text': new_text
-        })
-    
-    if progress_callback:
-        progress_callback(80, "Merged speaker labels with SRT entries.")
-    
-    # Rebuild the output.
-    srt_lines = []
-    for entry in merged_entries:
+    # The segments are chronological and disjoint, so the candidate for a
+    # subtitle is the last segment starting at or before it; one binary search
+    # per subtitle instead of a scan over all segments.
+    import numpy as np
+    segments = diarization_segments
+    if not isinstance(segments, DiarizationSegments):
+        segments = DiarizationSegments.from_tuples(segments)
+    entry_starts = np.fromiter((entry['start'] for entry in srt_entries), dtype=np.float64,
+                               count=len(srt_entries))
+    idx = np.searchsorted(segments.starts, entry_starts, side='right') - 1
+    safe_idx = np.maximum(idx, 0)
+    if len(segments):
+        hits = (idx >= 0) & (entry_starts < segments.ends[safe_idx])
+        speaker_numbers = segments.speakers[safe_idx].tolist()
+    else:
+        hits = np.zeros(len(srt_entries), dtype=bool)
+        speaker_numbers = [0] * len(srt_entries)
+    speaker_labels = [
+        f"[Speaker {speaker}]: " if hit else "[Speaker Unknown]: "
+        for speaker, hit in zip(speaker_numbers, hits.tolist())
+    ]
+
+    # Label each entry and write it out in the same pass.
+    buf = io.StringIO()
+    write = buf.write
+    for i, (entry, speaker_label) in enumerate(zip(srt_entries, speaker_labels)):
+        if i:
+            write("\n")  # Blank line between entries.
         # Only include segment numbers and timestamps if subtitles are enabled.
         if not remove_timestamps:
-            srt_lines.append(entry['index'])
-            if entry['timestamp']:
-                srt_lines.append(entry['timestamp'])
-        srt_lines.append(entry['text'])
-        srt_lines.append("")  # Blank line between entries.
+            write(entry['index'])
+            write("\n")
+            write(entry['start_str'])
+            write(" --> ")
+            write(entry['end_str'])
+            write("\n")
+        write(speaker_label)
+        write(entry['text'])
+        write("\n")
     
-    merged_text = "\n".join(srt_lines)
+    merged_text = buf.getvalue()
     
     if progress_callback:
         progress_callback(100, "Diarization merge complete.")
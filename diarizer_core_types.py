@@ -28,6 +28,7 @@ from pyannote.audio import Pipeline
 
  # Stores the start and end time in seconds internally for easier computation.
 class SubtitleContext():
+    __slots__ = ('start_time', 'end_time', 'text')
    
     # Tells if the segment is a song, the gender of the speaker, and whether it is music or noise.
     # If gender detection is disabled, segments are classified as 'speech' instead.
@@ -51,11 +52,11 @@ class SubtitleContext():
         minutes = int((total_seconds % 3600) // 60)
         seconds = int(total_seconds % 60)
         milliseconds = int(round((total_seconds - int(total_seconds)) * 1000))
-        timestamp = f"[{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}]"
-        print(f"[DEBUG] Formatted timestamp for {total_seconds} seconds: {timestamp}")
-        return timestamp
+        return f"[{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}]"
 
 class SpeakerInfo(SubtitleContext):
+    __slots__ = ('gender', 'simple_description', 'detailed_description', 'vector_representation')
+
     def __init__(self):
         super().__init__()
         self.gender: str = ""
@@ -1,8 +1,12 @@
 # file_export.py
 import os
+import threading
 from tkinter import filedialog, messagebox, Button, Frame
 import tkinter as tk  # Import tkinter here
 
+# Large write buffer: far fewer write calls on network shares
+EXPORT_BUFFER_SIZE = 256 * 1024
+
 def create_export_button(parent, app):
     """Creates the export transcription button."""
     export_frame = Frame(parent)  # No need to pack here
@@ -16,6 +20,25 @@ def create_export_button(parent, app):
     export_button.pack(fill="x", padx=10, pady=5)
     return export_frame, export_button  # Return both frame and button
 
+def _write_in_background(app, save_path, content, saved_message, error_prefix, error_title):
+    """
+    Writes content to save_path on a background thread so the Tk mainloop
+    keeps running; the outcome is reported back through the status bar.
+    """
+    def _do_write():
+        try:
+            with open(save_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as out_f:
+                out_f.write(content)
+            app.update_status(f"{saved_message} {save_path}", "green")
+        except Exception as e:
+            msg = f"{error_prefix}: {str(e)}"
+            app.update_status(msg, "red")
+            # Dialogs must be opened from the Tk thread
+            app.root.after(0, lambda: messagebox.showerror(error_title, msg))
+
+    app.update_status(f"Saving {save_path}...", "blue")
+    threading.Thread(target=_do_write, daemon=True).start()
+
 def export_transcription(app):
     """
     Export the transcription.
@@ -57,14 +80,8 @@ def export_transcription(app):
             parent=app.root
         )
         if save_path:
-            try:
-                with open(save_path, 'w', encoding='utf-8') as out_f:
-                    out_f.write(export_content)
-                app.update_status(f"SRT file saved to {save_path}", "green")
-            except Exception as e:
-                msg = f"Error saving SRT file: {str(e)}"
-                app.update_status(msg, "red")
-                messagebox.showerror("SRT Saving Error", msg)
+            _write_in_background(app, save_path, export_content,
+                                 "SRT file saved to", "Error saving SRT file", "SRT Saving Error")
         else:
             app.update_status("SRT file saving cancelled", "blue")
     else:
@@ -80,13 +97,7 @@ def export_transcription(app):
             parent=app.root
         )
         if save_path:
-            try:
-                with open(save_path, 'w', encoding='utf-8') as out_f:
-                    out_f.write(app.current_text)
-                app.update_status(f"Plain text file saved to {save_path}", "green")
-            except Exception as e:
-                msg = f"Error saving text file: {str(e)}"
-                app.update_status(msg, "red")
-                messagebox.showerror("TXT Saving Error", msg)
+            _write_in_background(app, save_path, app.current_text,
+                                 "Plain text file saved to", "Error saving text file", "TXT Saving Error")
         else:
             app.update_status("Text file saving cancelled", "blue")
@@ -28,6 +28,8 @@ Media Player Module for SoftWhisper
 │   ├── Position Updates
 │   │   ├── start_position_updates()
 │   │   ├── update_position()
+│   │   ├── _on_time_changed()
+│   │   ├── refresh_position()
 │   │   └── stop_position_updates()
 │   └── Utilities
 │       ├── format_time(seconds) -> str
@@ -36,10 +38,21 @@ Media Player Module for SoftWhisper
 
 import os
 import sys
+import threading
+import time
 import vlc
 import tkinter as tk
 from tkinter import ttk
 
+# VLC's time-changed events only raise a flag; the Tk thread checks it this often
+TIME_EVENT_CHECK_MS = 100
+# Safety-net refresh interval for when no time-changed event arrives
+POSITION_POLL_MS = 1000
+# Slider positions are rounded to this many percent (under a pixel at the default width)
+SLIDER_STEP = 0.25
+# Zero-padded two-digit strings for the HH:MM:SS fields
+_TWO_DIGITS = [f"{i:02}" for i in range(100)]
+
 class MediaPlayer:
     """
     Handles media playback core functionality.
@@ -58,6 +71,9 @@ class MediaPlayer:
         self.time_callback = time_callback
         self.slider_dragging = False
         self.file_path = None
+        # Media length in ms, read from VLC once it is known
+        self._length = 0
+        self._media = None
         
         # Initialize VLC
         self.vlc_instance = vlc.Instance()
@@ -65,6 +81,25 @@ class MediaPlayer:
         
         # Configure the player based on platform
         self._setup_video_frame()
+        
+        # VLC reports playback progress itself; no need to poll for it
+        if self.time_callback:
+            self.player.event_manager().event_attach(
+                vlc.EventType.MediaPlayerTimeChanged, self._on_time_changed)
+    
+    def _on_time_changed(self, event):
+        """Forward VLC's time-changed and parsed events. Runs on a VLC thread, so it must not call into libvlc or Tk."""
+        self.time_callback()
+    
+    def detach_events(self):
+        """Stop forwarding VLC events."""
+        if self.time_callback:
+            try:
+                self.player.event_manager().event_detach(vlc.EventType.MediaPlayerTimeChanged)
+                if self._media is not None:
+                    self._media.event_manager().event_detach(vlc.EventType.MediaParsedChanged)
+            except Exception as e:
+                print(f"Error detaching events: {e}")
     
     def _setup_video_frame(self):
         """Setup the video display based on the current platform."""
@@ -92,7 +127,17 @@ class MediaPlayer:
         try:
             self.file_path = file_path
             media = self.vlc_instance.media_new(file_path)
+            # Parse in the background so reading the length never stalls the UI;
+            # the UI refreshes once the length is known
+            if self.time_callback:
+                media.event_manager().event_attach(
+                    vlc.EventType.MediaParsedChanged, self._on_time_changed)
+            if hasattr(media, "parse_with_options"):
+                media.parse_with_options(vlc.MediaParseFlag.local, -1)
             self.player.set_media(media)
+            # Keep a reference so the event callback lives as long as the media
+            self._media = media
+            self._length = 0
             return True
         except Exception as e:
             print(f"Error loading media: {e}")
@@ -148,7 +193,7 @@ class MediaPlayer:
             value: Position value from 0-100
         """
         try:
-            if self.player and self.player.get_length() > 0:
+            if self.player and self._media_length() > 0:
                 position = value / 100
                 self.player.set_position(position)
         except Exception as e:
@@ -161,9 +206,11 @@ class MediaPlayer:
         Returns:
             dict: Contains current_time, total_time in ms, and position %
         """
-        length = self.player.get_length() if self.player else 0
-        current_time = self.player.get_time() if self.player else 0
-        position = self.player.get_position() * 100 if self.player else 0
+        if not self.player:
+            return {"current_time": 0, "total_time": 0, "position": 0}
+        length = self._media_length()
+        current_time = max(self.player.get_time(), 0)
+        position = current_time * 100 / length if length > 0 else 0
         
         return {
             "current_time": current_time,
@@ -185,7 +232,16 @@ class MediaPlayer:
         """Get the duration of the current media in seconds."""
         if not self.player:
             return 0
-        return self.player.get_length() / 1000
+        return self._media_length() / 1000
+    
+    def _media_length(self):
+        """
+        Length of the current media in ms. It does not change once VLC knows it,
+        so it is only asked for until it is positive.
+        """
+        if self._length <= 0:
+            self._length = self.player.get_length()
+        return self._length
 
 class MediaPlayerUI:
     """
@@ -207,7 +263,7 @@ class MediaPlayerUI:
             time_label: Label widget for time display
             error_callback: Function to call with error messages
         """
-        self.player = MediaPlayer(parent_frame)
+        self.player = MediaPlayer(parent_frame, time_callback=self._on_time_changed)
         self.play_button = play_button
         self.pause_button = pause_button
         self.stop_button = stop_button
@@ -215,6 +271,14 @@ class MediaPlayerUI:
         self.time_label = time_label
         self.error_callback = error_callback
         self.update_timer = None
+        # Set by VLC's event thread, consumed by the Tk-side update tick
+        self._time_changed = threading.Event()
+        self._last_refresh = 0.0
+        # Last values written to the slider and time label
+        self._last_slider = None
+        self._last_time_text = None
+        self._total_time = None
+        self._total_time_str = ""
         
         # Connect slider events
         self.slider.bind('<ButtonPress-1>', self.on_slider_press)
@@ -235,8 +299,7 @@ class MediaPlayerUI:
                 self.play_button.config(state=tk.NORMAL)
                 self.pause_button.config(state=tk.NORMAL)
                 self.stop_button.config(state=tk.NORMAL)
-                self.slider.set(0)
-                self.time_label.config(text="00:00:00 / 00:00:00")
+                self._show_position(0, "00:00:00 / 00:00:00")
                 self.start_position_updates()
                 return True
             else:
@@ -271,8 +334,7 @@ class MediaPlayerUI:
         """Stop media playback and reset UI elements."""
         try:
             if self.player.stop():
-                self.slider.set(0)
-                self.time_label.config(text="00:00:00 / 00:00:00")
+                self._show_position(0, "00:00:00 / 00:00:00")
             else:
                 self._show_error("Failed to stop media")
         except Exception as e:
@@ -285,13 +347,38 @@ class MediaPlayerUI:
     def on_slider_release(self, event):
         """Handle slider release and seek to position."""
         value = self.slider.get()
+        # The user moved the slider, so the cached value no longer matches it
+        self._last_slider = None
         self.player.on_slider_release(event, value)
     
     def start_position_updates(self):
         """Start periodic updates of the position slider and time label."""
+        # Only one update chain may run, however often play is pressed
+        self.stop_position_updates()
         self.update_position()
     
+    def _on_time_changed(self):
+        """
+        Called from a VLC thread whenever the playback time changes. It only
+        raises a flag: any Tk call from here blocks until the Tk thread serves
+        it, and the Tk thread may itself be inside player.stop() waiting for
+        this VLC thread to finish.
+        """
+        self._time_changed.set()
+    
     def update_position(self):
+        """
+        Refresh the position when VLC has reported a time change (or, as a
+        safety net, when POSITION_POLL_MS has passed) and schedule the next check.
+        """
+        now = time.monotonic()
+        if self._time_changed.is_set() or now - self._last_refresh >= POSITION_POLL_MS / 1000:
+            self._time_changed.clear()
+            self._last_refresh = now
+            self.refresh_position()
+        self.update_timer = self.time_label.after(TIME_EVENT_CHECK_MS, self.update_position)
+    
+    def refresh_position(self):
         """Update the slider position and time label based on current playback."""
         if not self.player:
             return
@@ -300,18 +387,29 @@ class MediaPlayerUI:
             position_info = self.player.get_position_info()
             
             if not self.player.slider_dragging and position_info["total_time"] > 0:
-                # Update slider
-                self.slider.set(position_info["position"])
-                
-                # Update time label
                 current_time_str = self.format_time(position_info["current_time"] // 1000)
-                total_time_str = self.format_time(position_info["total_time"] // 1000)
-                self.time_label.config(text=f"{current_time_str} / {total_time_str}")
+                total_time = position_info["total_time"]
+                # The length only changes while VLC is still parsing the media
+                if total_time != self._total_time:
+                    self._total_time = total_time
+                    self._total_time_str = self.format_time(total_time // 1000)
+                total_time_str = self._total_time_str
+                self._show_position(position_info["position"], f"{current_time_str} / {total_time_str}")
         except Exception as e:
             print(f"Error updating position: {e}")
-            
-        # Schedule next update
-        self.update_timer = self.time_label.after(200, self.update_position)
+    
+    def _show_position(self, position, time_text):
+        """
+        Set the slider and time label, touching each widget only when what it
+        shows actually changes.
+        """
+        position = round(position / SLIDER_STEP) * SLIDER_STEP
+        if position != self._last_slider:
+            self._last_slider = position
+            self.slider.set(position)
+        if time_text != self._last_time_text:
+            self._last_time_text = time_text
+            self.time_label.config(text=time_text)
     
     def stop_position_updates(self):
         """Stop periodic position updates."""
@@ -323,6 +421,7 @@ class MediaPlayerUI:
         """Stop playback and clean up resources."""
         self.stop_position_updates()
         if self.player:
+            self.player.detach_events()
             self.player.stop()
     
     def format_time(self, seconds):
@@ -335,10 +434,10 @@ class MediaPlayerUI:
         Returns:
             str: Formatted time string
         """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02}:{minutes:02}:{secs:02}"
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        hours_str = _TWO_DIGITS[hours] if hours < 100 else str(hours)
+        return f"{hours_str}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[secs]}"
     
     def _show_error(self, message):
         """Show error message via callback or messagebox."""
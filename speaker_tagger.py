@@ -18,8 +18,12 @@ Usage:
 ================================================================================
 """
 
+import hashlib
+import os
 import sys
 import subprocess
+import threading
+import wave
 from pathlib import Path
 from typing import Optional
 import numpy as np
@@ -30,36 +34,122 @@ from sklearn.metrics.pairwise import cosine_distances
 import diarizer_core_types
 
 # --- Constants & Configuration ---
-AUDIO_CACHE_FOLDER = Path("./audio_cache")
+# Next to the GUI's diarization cache, so extractions never land in the working directory
+AUDIO_CACHE_FOLDER = Path.home() / ".cache" / "softwhisper" / "audio"
+AUDIO_CACHE_MAX_FILES = 8  # extracted WAVs kept for reuse
+CACHE_KEY_BLOCK = 64 * 1024
 FRAME_DURATION = 0.05  # seconds per frame
+SAMPLE_RATE = 16000  # audio is decoded once at this rate for the embeddings
+N_FFT = 2048  # librosa's MFCC defaults, used for the whole-file spectrogram
+HOP_LENGTH = 512
+MEL_BLOCK_FRAMES = 4096  # STFT frames computed at a time (about 2 minutes of audio)
+N_MFCC = 40
+EMBEDDING_DIM = N_MFCC * 3 * 2  # (static + delta + delta-delta) * (mean + std)
+CLUSTER_DISTANCE_THRESHOLD = 0.05  # cosine distance below which segments merge into one speaker
+PARALLEL_MIN_SEGMENTS = 32  # below this, dispatching to worker threads costs more than it saves
+# Per-segment progress lines (two per segment) are only printed when asked for;
+# warnings and errors are always printed
+LOG_SEGMENT_DETAILS = os.environ.get("SOFTWHISPER_DEBUG_SEGMENTS", "0") != "0"
 
 # --- Logging Function ---
 def _log(message: str):
     print(f"[DEBUG SpeakerTagger] {message}")
 
+# --- Shared Segmenter ---
+_segmenter = None
+_segmenter_lock = threading.Lock()
+
+def _get_segmenter():
+    # Loading the segmentation model takes seconds, so it is done once per process
+    global _segmenter
+    with _segmenter_lock:
+        if _segmenter is None:
+            _segmenter = Segmenter()
+        return _segmenter
+
 # --- Audio Extraction Helper ---
+def _cache_key(file_path: Path) -> str:
+    # Identifies a file by its mtime, size and first/last 64 KiB
+    st = file_path.stat()
+    h = hashlib.sha1(f"{st.st_mtime_ns}|{st.st_size}".encode("ascii"))
+    with open(file_path, "rb") as f:
+        h.update(f.read(CACHE_KEY_BLOCK))
+        if st.st_size > 2 * CACHE_KEY_BLOCK:
+            f.seek(-CACHE_KEY_BLOCK, os.SEEK_END)
+            h.update(f.read(CACHE_KEY_BLOCK))
+    return h.hexdigest()
+
+def _prune_audio_cache():
+    # Keep only the AUDIO_CACHE_MAX_FILES most recently used extractions
+    try:
+        entries = sorted(AUDIO_CACHE_FOLDER.glob("*_16k.wav"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[AUDIO_CACHE_MAX_FILES:]:
+            stale.unlink()
+    except OSError:
+        pass
+
+def _is_16k_mono_wav(file_path: Path) -> bool:
+    # Reads the WAV header only; anything unreadable counts as "no"
+    try:
+        with wave.open(str(file_path), "rb") as w:
+            return w.getframerate() == 16000 and w.getnchannels() == 1 and w.getsampwidth() == 2
+    except (wave.Error, EOFError, OSError):
+        return False
+
 def extract_audio(file_path: Path) -> Path:
-    if file_path.suffix.lower() in ['.wav', '.mp3']:
-        _log(f"Input file {file_path} is already an audio file.")
+    if _is_16k_mono_wav(file_path):
+        _log(f"Input file {file_path} is already 16 kHz mono audio.")
         return file_path
     if not AUDIO_CACHE_FOLDER.exists():
         AUDIO_CACHE_FOLDER.mkdir(parents=True, exist_ok=True)
-    audio_output_path = AUDIO_CACHE_FOLDER / (file_path.stem + "_audio_16k.wav")
+    audio_output_path = AUDIO_CACHE_FOLDER / (_cache_key(file_path) + "_16k.wav")
+    if audio_output_path.exists():
+        _log(f"Reusing extracted audio {audio_output_path}.")
+        audio_output_path.touch()  # mark as recently used
+        return audio_output_path
+    part_path = audio_output_path.with_suffix(".part.wav")
     _log(f"Extracting audio from {file_path} to {audio_output_path}...")
     command = [
         "ffmpeg", "-y", "-i", str(file_path),
         "-vn", "-acodec", "pcm_s16le", "-ac", "1", "-ar", "16000",
-        "-hide_banner", "-loglevel", "error", str(audio_output_path)
+        "-hide_banner", "-loglevel", "error", str(part_path)
     ]
     result = subprocess.run(command, capture_output=True, text=True)
     if result.returncode != 0:
         _log(f"[ERROR] FFmpeg extraction failed with code {result.returncode}.")
-        if audio_output_path.exists():
-            audio_output_path.unlink()
-        sys.exit(1)
+        if part_path.exists():
+            part_path.unlink()
+        raise DiarizationError(f"FFmpeg could not extract audio from {file_path}")
+    # Only complete extractions get the cache name
+    os.replace(part_path, audio_output_path)
+    _prune_audio_cache()
     _log(f"Audio extracted to {audio_output_path}.")
     return audio_output_path
 
+def decode_audio(file_path: Path) -> np.ndarray:
+    # Decodes straight to 16 kHz mono float32 through an ffmpeg pipe, with no
+    # intermediate WAV; librosa is only used if ffmpeg cannot read the file.
+    # A WAV that is already 16 kHz mono (e.g. from extract_audio) is read as is.
+    if _is_16k_mono_wav(file_path):
+        with wave.open(str(file_path), "rb") as w:
+            frames = w.readframes(w.getnframes())
+        return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    command = [
+        "ffmpeg", "-nostdin", "-i", str(file_path),
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-hide_banner", "-loglevel", "error", "-"
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except OSError as e:
+        _log(f"[WARN] Could not run FFmpeg ({e}); decoding with librosa.")
+    else:
+        if result.returncode == 0:
+            return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+        _log(f"[WARN] FFmpeg decoding failed with code {result.returncode}; decoding with librosa.")
+    audio, _ = librosa.load(str(file_path), sr=SAMPLE_RATE)
+    return audio
+
 # --- convert_to_mp4 function ---
 def convert_to_mp4(input_path: Path) -> Optional[Path]:
     output_path = input_path.parent / (input_path.stem + "_converted.mp4")
@@ -93,20 +183,98 @@ def convert_to_mp4(input_path: Path) -> Optional[Path]:
 
 # --- Function to merge consecutive segments ---
 def merge_segments(segments, gap_threshold=0.5):
+    # Joins consecutive segments with the same label and a gap of at most
+    # gap_threshold; the run boundaries are found with array operations
     if not segments:
          return segments
-    merged = [segments[0]]
-    for seg in segments[1:]:
-         last_seg = merged[-1]
-         if seg[0] == last_seg[0] and (float(seg[1]) - float(last_seg[2])) <= gap_threshold:
-              new_seg = (last_seg[0], last_seg[1], seg[2]) + last_seg[3:]
-              merged[-1] = new_seg
-         else:
-              merged.append(seg)
+    labels = np.array([seg[0] for seg in segments])
+    starts = np.array([float(seg[1]) for seg in segments])
+    ends = np.array([float(seg[2]) for seg in segments])
+    boundary = (labels[1:] != labels[:-1]) | (starts[1:] - ends[:-1] > gap_threshold)
+    run_starts = np.flatnonzero(boundary) + 1
+    firsts = [0] + run_starts.tolist()
+    lasts = (run_starts - 1).tolist() + [len(segments) - 1]
+    merged = []
+    for first, last in zip(firsts, lasts):
+         seg = segments[first]
+         if first != last:
+              seg = (seg[0], seg[1], segments[last][2]) + tuple(seg[3:])
+         merged.append(seg)
     return merged
 
+def _mean_std(features):
+    """
+    Per-coefficient mean and standard deviation of a [k, n_mfcc, frames]
+    feature stack, from a single sweep over the data (sum and sum of squares,
+    accumulated in float64 to keep the variance accurate).
+
+    Returns a flat array holding, for each of the k features in turn, its
+    n_mfcc means followed by its n_mfcc standard deviations.
+    """
+    features = features.astype(np.float64, copy=False)
+    n = features.shape[-1]
+    mean = features.sum(axis=-1) / n
+    mean_sq = np.einsum('ijk,ijk->ij', features, features) / n
+    std = np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+    return np.stack([mean, std], axis=1).ravel()
+
+
+def mel_power_spectrogram(audio, sr=SAMPLE_RATE):
+    """
+    Mel power spectrogram of a whole waveform with librosa's MFCC defaults
+    (centered frames, N_FFT / HOP_LENGTH), so per-segment MFCCs can be cut
+    from it instead of running an STFT per segment.
+
+    The STFT is taken MEL_BLOCK_FRAMES frames at a time over the zero-padded
+    signal, which keeps the complex spectrum of a long file out of memory.
+    """
+    padded = np.pad(audio, N_FFT // 2)
+    n_frames = 1 + len(audio) // HOP_LENGTH
+    blocks = []
+    for first in range(0, n_frames, MEL_BLOCK_FRAMES):
+        last = min(first + MEL_BLOCK_FRAMES, n_frames)
+        block = padded[first * HOP_LENGTH:(last - 1) * HOP_LENGTH + N_FFT]
+        blocks.append(librosa.feature.melspectrogram(y=block, sr=sr, n_fft=N_FFT,
+                                                     hop_length=HOP_LENGTH, center=False))
+    return np.concatenate(blocks, axis=1)
+
+
+def _segment_mel(audio, mel, first_sample, end_sample, sr=SAMPLE_RATE):
+    """
+    Mel power spectrogram of audio[first_sample:end_sample] as librosa would
+    compute it for the segment on its own (centered, zero-padded frames),
+    reusing the whole-file spectrogram for every frame that lies entirely
+    inside the segment.
+
+    first_sample must be a multiple of HOP_LENGTH, so the segment's frames
+    line up with the whole-file ones. The few frames at each edge overlap
+    the segment's zero padding and are computed from the samples instead.
+    """
+    pad = N_FFT // 2
+    n_samples = end_sample - first_sample
+    n_frames = 1 + n_samples // HOP_LENGTH
+    # Frames [inner_first, inner_last) have their whole window inside the segment
+    inner_first = min(-(-pad // HOP_LENGTH), n_frames)
+    inner_last = max(inner_first, min(n_frames, (n_samples - pad) // HOP_LENGTH + 1))
+    padded = np.pad(audio[first_sample:end_sample], pad)
+
+    def _edge(first, last):
+        if first >= last:
+            return np.empty((mel.shape[0], 0), dtype=mel.dtype)
+        return librosa.feature.melspectrogram(
+            y=padded[first * HOP_LENGTH:(last - 1) * HOP_LENGTH + N_FFT], sr=sr,
+            n_fft=N_FFT, hop_length=HOP_LENGTH, center=False).astype(mel.dtype, copy=False)
+
+    offset = first_sample // HOP_LENGTH
+    return np.concatenate([
+        _edge(0, inner_first),
+        mel[:, offset + inner_first:offset + inner_last],
+        _edge(inner_last, n_frames),
+    ], axis=1)
+
+
 # --- Function to compute speaker embedding using MFCC mean and std ---
-def get_embeddings(audio_path: Path, start: float, end: float, orig_label: str = "", n_mfcc=40):
+def get_embeddings(audio, start: float, end: float, orig_label: str = "", n_mfcc=N_MFCC, sr=SAMPLE_RATE, mel=None):
     """
     Computes a speaker embedding for an audio segment using MFCCs and their
     first (delta) and second (delta-delta) derivatives.
@@ -115,11 +283,17 @@ def get_embeddings(audio_path: Path, start: float, end: float, orig_label: str =
     of static MFCCs, delta MFCCs, and delta-delta MFCCs.
 
     Args:
-        audio_path: Path to the full audio file.
+        audio: The full decoded waveform (mono, at sr), sliced for the
+            segment; or a path, in which case only the segment is loaded.
+            Must be the waveform when mel is given.
         start: Start time of the segment in seconds.
         end: End time of the segment in seconds.
         orig_label: Original label of the segment (for logging).
         n_mfcc: Number of MFCC coefficients to compute.
+        sr: Sample rate of audio when it is a waveform.
+        mel: Optional mel power spectrogram of the whole file (from
+            mel_power_spectrogram); when given, the segment's inner frames
+            are sliced from it and only its edge frames are computed.
 
     Returns:
         A normalized numpy array representing the speaker embedding.
@@ -138,20 +312,38 @@ def get_embeddings(audio_path: Path, start: float, end: float, orig_label: str =
             embedding = np.zeros(embedding_dim) + 1e-6
             return embedding / np.linalg.norm(embedding)
 
-        # Load the specific audio segment
-        y, sr = librosa.load(str(audio_path), sr=16000, offset=start, duration=duration)
+        # Slice the segment out of the decoded audio (or load just the segment)
+        first_sample = int(start * sr)
+        if mel is not None:
+            # Snap the start to the spectrogram's frame grid (moving it by at
+            # most HOP_LENGTH / 2 samples, 16 ms) so its frames can be reused
+            first_sample = (first_sample + HOP_LENGTH // 2) // HOP_LENGTH * HOP_LENGTH
+            n_samples = min(int(end * sr), len(audio)) - first_sample
+        else:
+            if isinstance(audio, np.ndarray):
+                y = audio[first_sample:int(end * sr)]
+            else:
+                y, sr = librosa.load(str(audio), sr=SAMPLE_RATE, offset=start, duration=duration)
+            n_samples = len(y)
 
         # Check if loaded audio is substantial enough
         # n_fft default is 2048, hop_length default is 512. Need at least n_fft samples.
-        if len(y) < 2048:
-             _log(f"[WARN] Not enough audio samples ({len(y)}) loaded for segment "
+        if n_samples < N_FFT:
+             _log(f"[WARN] Not enough audio samples ({n_samples}) loaded for segment "
                   f"{orig_label}-{start:.2f}-{end:.2f}. Returning zero vector.")
              embedding = np.zeros(embedding_dim) + 1e-6
              return embedding / np.linalg.norm(embedding)
 
-        # 1. Compute static MFCC features
-        mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc)
-        _log(f"MFCC shape for segment {orig_label}-{start:.2f}-{end:.2f}: {mfcc.shape}")
+        # 1. Compute static MFCC features. With mel, these are librosa's frames
+        # for the segment on its own (edges zero-padded), except that its start
+        # is snapped to the hop grid as above.
+        if mel is not None:
+            segment_mel = _segment_mel(audio, mel, first_sample, first_sample + n_samples, sr)
+            mfcc = librosa.feature.mfcc(S=librosa.power_to_db(segment_mel), n_mfcc=n_mfcc)
+        else:
+            mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc)
+        if LOG_SEGMENT_DETAILS:
+            _log(f"MFCC shape for segment {orig_label}-{start:.2f}-{end:.2f}: {mfcc.shape}")
 
         # Check if we have enough frames for delta calculation (librosa.feature.delta default width is 9)
         # Need at least ceil(width / 2) frames, typically 5 for width=9. Let's use a slightly safer margin.
@@ -160,11 +352,9 @@ def get_embeddings(audio_path: Path, start: float, end: float, orig_label: str =
             _log(f"[WARN] Segment yielded too few MFCC frames ({mfcc.shape[1]}) "
                  f"for delta calculation: {orig_label}-{start:.2f}-{end:.2f}. "
                  f"Using only static MFCC stats and padding.")
-            mfcc_mean = np.mean(mfcc, axis=1)
-            mfcc_std = np.std(mfcc, axis=1)
             # Create embedding with static stats and pad the rest with zeros
             # Dimension for static = n_mfcc * 2
-            static_embedding = np.concatenate([mfcc_mean, mfcc_std])
+            static_embedding = _mean_std(mfcc[np.newaxis])
             padding = np.zeros(embedding_dim - (n_mfcc * 2))
             embedding = np.concatenate([static_embedding, padding])
 
@@ -175,22 +365,12 @@ def get_embeddings(audio_path: Path, start: float, end: float, orig_label: str =
             # 3. Compute Delta-Delta features
             mfcc_delta2 = librosa.feature.delta(mfcc, order=2)
 
-            # 4. Calculate statistics for each feature type
-            mfcc_mean = np.mean(mfcc, axis=1)
-            mfcc_std = np.std(mfcc, axis=1)
-            delta_mean = np.mean(mfcc_delta, axis=1)
-            delta_std = np.std(mfcc_delta, axis=1)
-            delta2_mean = np.mean(mfcc_delta2, axis=1)
-            delta2_std = np.std(mfcc_delta2, axis=1)
-
-            # 5. Concatenate all stats to form the final embedding
-            embedding = np.concatenate([
-                mfcc_mean, mfcc_std,
-                delta_mean, delta_std,
-                delta2_mean, delta2_std
-            ])
+            # 4./5. Statistics for all three feature types in one pass, laid out as
+            # mfcc mean, mfcc std, delta mean, delta std, delta2 mean, delta2 std
+            embedding = _mean_std(np.stack([mfcc, mfcc_delta, mfcc_delta2]))
 
-        _log(f"Computed embedding for segment {orig_label}-{start:.2f}-{end:.2f} with target shape ({embedding_dim},). Actual shape: {embedding.shape}")
+        if LOG_SEGMENT_DETAILS:
+            _log(f"Computed embedding for segment {orig_label}-{start:.2f}-{end:.2f} with target shape ({embedding_dim},). Actual shape: {embedding.shape}")
 
         # 6. Normalize the final embedding (L2 norm)
         norm = np.linalg.norm(embedding)
@@ -218,22 +398,46 @@ def get_gender(orig_label: str) -> str:
     else:
         return "unknown"
 
+class DiarizationCancelled(Exception):
+    """Raised by process_audio when its stop_event is set."""
+
+class DiarizationError(Exception):
+    """Raised by extract_audio and process_audio when diarization fails."""
+
 # --- Speaker Tagger Class with Gender-aware Clustering and Chronological Labeling ---
 class SpeakerTagger:
     def __init__(self):
         _log("SpeakerTagger initialized in auto-detection mode.")
 
-    def process_audio(self, audio_path: Path):
+    def process_audio(self, audio_path: Path, stop_event=None):
+        # stop_event (a threading.Event) is checked between stages and between
+        # segments; setting it makes process_audio raise DiarizationCancelled
+        def _check_stop():
+            if stop_event is not None and stop_event.is_set():
+                raise DiarizationCancelled()
+
+        def _embed(start, end, orig_label):
+            _check_stop()
+            return get_embeddings(audio, start, end, orig_label, mel=mel)
+
         _log(f"Processing audio: {audio_path}")
         try:
-            segmenter = Segmenter()
+            _check_stop()
+            segmenter = _get_segmenter()
             segments = segmenter(str(audio_path))
+            _check_stop()
             _log(f"Speech segmentation completed. {len(segments)} segments found.")
             segments = merge_segments(segments)
             _log(f"After merging, {len(segments)} segments remain.")
 
+            # Decode the audio and take its mel spectrogram once; each segment's
+            # MFCCs then come from a slice of it plus its recomputed edge frames.
+            audio = decode_audio(audio_path)
+            mel = mel_power_spectrogram(audio)
+            _check_stop()
+
             # For each valid segment, extract embedding and detected gender.
-            embeddings = []
+            jobs = []
             valid_segments = []
             genders = []
             for seg in segments:
@@ -245,33 +449,59 @@ class SpeakerTagger:
                     except Exception as e:
                         _log(f"[ERROR] Could not convert start/end to float for segment {seg}: {e}")
                         continue
-                    emb = get_embeddings(audio_path, start, end, orig_label)
-                    embeddings.append(emb)
+                    jobs.append((start, end, orig_label))
                     valid_segments.append(seg)
                     genders.append(get_gender(orig_label))
-            embeddings = np.array(embeddings)
+            # Segments are independent, so embeddings are computed on all cores.
+            # Threads, not processes: the per-segment work is NumPy/librosa code
+            # that releases the GIL, threads share the spectrogram as is, and
+            # worker processes would have to import this module (TensorFlow,
+            # pyannote) and re-run the frozen app's entry point.
+            if len(jobs) >= PARALLEL_MIN_SEGMENTS:
+                from joblib import Parallel, delayed
+                results = Parallel(n_jobs=-1, prefer="threads")(
+                    delayed(_embed)(start, end, orig_label) for start, end, orig_label in jobs
+                )
+            else:
+                results = (_embed(start, end, orig_label) for start, end, orig_label in jobs)
+            # Each embedding is written straight into one preallocated matrix.
+            # float32 is ample for cosine distances against a 0.05 threshold and
+            # halves the size of the N x N distance matrix.
+            embeddings = np.empty((len(jobs), EMBEDDING_DIM), dtype=np.float32)
+            for i, embedding in enumerate(results):
+                embeddings[i] = embedding
             _log(f"Computed embeddings for segments, resulting in shape {embeddings.shape}.")
+            _check_stop()
 
             # Group segments by gender and perform clustering for each group separately.
             groups = {}
-            for emb, seg, gender in zip(embeddings, valid_segments, genders):
-                groups.setdefault(gender, {"embeddings": [], "segments": []})
-                groups[gender]["embeddings"].append(emb)
-                groups[gender]["segments"].append(seg)
+            for i, gender in enumerate(genders):
+                groups.setdefault(gender, []).append(i)
+
+            # The embeddings are L2-normalized, so a single matrix product gives
+            # every pairwise cosine distance; each gender group uses its block.
+            if len(embeddings):
+                distances = embeddings @ embeddings.T
+                np.subtract(1.0, distances, out=distances)
+                np.clip(distances, 0.0, 2.0, out=distances)
+                np.fill_diagonal(distances, 0.0)
 
             # Run clustering on each gender group.
             composite_labels = {}  # key: composite label (gender, cluster), value: new speaker number
             group_clustered_segments = []
-            for gender, data in groups.items():
-                group_emb = np.array(data["embeddings"])
-                group_segs = data["segments"]
-                if len(group_emb) == 0:
-                    continue
-                clustering = AgglomerativeClustering(metric='cosine',
-                                                     linkage='average',
-                                                     distance_threshold=0.05, 
-                                                     n_clusters=None)
-                group_labels = clustering.fit_predict(group_emb)
+            for gender, indices in groups.items():
+                group_segs = [valid_segments[i] for i in indices]
+                group_distances = distances[np.ix_(indices, indices)]
+                # A single segment, or segments all closer than the threshold (e.g. only
+                # fallback vectors), form one cluster; scikit-learn rejects single samples.
+                if len(indices) == 1 or group_distances.max() < CLUSTER_DISTANCE_THRESHOLD:
+                    group_labels = np.zeros(len(indices), dtype=int)
+                else:
+                    clustering = AgglomerativeClustering(metric='precomputed',
+                                                         linkage='average',
+                                                         distance_threshold=CLUSTER_DISTANCE_THRESHOLD,
+                                                         n_clusters=None)
+                    group_labels = clustering.fit_predict(group_distances)
                 _log(f"Gender group '{gender}' produced {len(set(group_labels))} clusters.")
                 # Add composite label (gender, original cluster) to each segment.
                 for seg, clabel in zip(group_segs, group_labels):
@@ -302,9 +532,12 @@ class SpeakerTagger:
             _log(f"Chronologically assigned {next_speaker_number} unique speakers.")
             return final_segments
 
+        except DiarizationCancelled:
+            _log("Diarization cancelled.")
+            raise
         except Exception as e:
             _log(f"[ERROR] Speech segmentation and clustering failed: {e}")
-            sys.exit(1)
+            raise DiarizationError(f"Speech segmentation and clustering failed: {e}") from e
 
 def format_speaker_label(speaker_num: int) -> str:
     # Format speaker number into a label like 'Speaker 1', 'Speaker 2', etc.
@@ -313,9 +546,12 @@ def format_speaker_label(speaker_num: int) -> str:
 # --- Main Execution ---
 def main(input_file: str, output_file: str):
     file_path = Path(input_file)
-    audio_path = extract_audio(file_path)
     tagger = SpeakerTagger()
-    segments = tagger.process_audio(audio_path)
+    try:
+        audio_path = extract_audio(file_path)
+        segments = tagger.process_audio(audio_path)
+    except DiarizationError:
+        sys.exit(1)
     with open(output_file, "w") as f:
         for seg in segments:
             # seg is (start, end, speaker_number, gender, orig_label) - 5 values
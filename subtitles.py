@@ -2,77 +2,138 @@
 Minimal function to transform Whisper's bracketed output to SRT format
 """
 
+import io
 import os
-import re
-import tkinter.filedialog as filedialog
-import tkinter.messagebox as messagebox
 
-def whisper_to_srt(whisper_output):
+# Whisper's console lines have a fixed-width prefix, "[HH:MM:SS.mmm --> HH:MM:SS.mmm] ",
+# so the timestamps and text are read by position
+_TS_PREFIX_LEN = 32
+
+# Same write buffer as file_export's exports (kept here so saving needs no Tk import)
+SRT_BUFFER_SIZE = 256 * 1024
+
+def _is_srt(text):
     """
-    Convert Whisper output to SRT format with minimal changes.
+    Whether text already starts like an SRT file: an entry number, then a
+    "HH:MM:SS,mmm --> HH:MM:SS,mmm" timing line. Only the head is looked at.
     """
-    # Split into lines and process each line
-    lines = whisper_output.strip().split('\n')
-    srt_parts = []
-    
+    head = text[:200].lstrip().split('\n', 2)
+    if len(head) < 3 or not head[0].strip().isdigit():
+        return False
+    timing = head[1].strip()
+    return len(timing) >= 29 and timing[8] == ',' and timing[12:17] == ' --> ' and timing[25] == ','
+
+def iter_srt(whisper_output):
+    """
+    Yield the SRT text for Whisper output one entry at a time, so it can be
+    written out without building the whole file in memory.
+    """
+    if _is_srt(whisper_output):
+        # Already converted; there are no bracketed lines to find
+        yield whisper_output
+        return
+    separator = ""  # entries after the first start with the separating empty line
     counter = 1
-    for line in lines:
-        # Match the timestamp pattern
-        match = re.match(r'\[(\d{2}:\d{2}:\d{2}\.\d{3}) --> (\d{2}:\d{2}:\d{2}\.\d{3})\] (.*)', line.strip())
-        if match:
-            start_time, end_time, text = match.groups()
-            
-            # Convert dots to commas
-            start_time = start_time.replace('.', ',')
-            end_time = end_time.replace('.', ',')
+    # Lines are stripped one by one below, so the output itself is not
+    # stripped first (that would copy the whole transcript)
+    for line in whisper_output.split('\n'):
+        # Match the timestamp prefix
+        line = line.strip()
+        if (len(line) >= _TS_PREFIX_LEN and line[0] == '[' and line[13:18] == ' --> '
+                and line[30:32] == '] ' and line[9] == line[26] == '.'
+                and line[3] == line[6] == line[20] == line[23] == ':'):
+            # "HH:MM:SS.mmm --> HH:MM:SS.mmm" is already the SRT timing line
+            # once dots become commas, so it is converted in one pass
+            timing, text = line[1:30].replace('.', ','), line[32:]
             
             # Format as SRT entry
-            srt_parts.append(f"{counter}")
-            srt_parts.append(f"{start_time} --> {end_time}")
-            srt_parts.append(f"{text.strip()}")
-            srt_parts.append("")  # Empty line
+            yield f"{separator}{counter}\n{timing}\n{text.strip()}\n"
+            separator = "\n"
             
             counter += 1
-    
-    return "\n".join(srt_parts)
 
-def save_whisper_as_srt(whisper_output, original_file_path, parent_window=None, status_callback=None):
-    """Save Whisper output as SRT with minimal conversion."""
+def whisper_to_srt(whisper_output):
+    """
+    Convert Whisper output to SRT format with minimal changes.
+    """
+    # Each entry goes into one growing buffer and is released right away,
+    # rather than all entries being held for a join
+    buf = io.StringIO()
+    buf.writelines(iter_srt(whisper_output))
+    return buf.getvalue()
+
+def _srt_time(cs):
+    """Format centiseconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    seconds, cs = divmod(int(cs), 100)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{cs * 10:03d}"
+
+def segments_to_srt(segments):
+    """
+    Convert parsed segments ({'t0', 't1', 'text'}, times in centiseconds)
+    to SRT format. Produces the same layout as whisper_to_srt without
+    re-parsing the raw output.
+    """
+    parts = [
+        f"{counter}\n{_srt_time(seg['t0'])} --> {_srt_time(seg['t1'])}\n{seg['text'].strip()}\n"
+        for counter, seg in enumerate(segments, 1)
+    ]
+    return "\n".join(parts)
+
+def save_whisper_as_srt(whisper_output, original_file_path, parent_window=None, status_callback=None,
+                        save_path=None, error_callback=None):
+    """
+    Save Whisper output as SRT with minimal conversion.
+    
+    When save_path is given the file is written there without asking, and
+    error_callback (if given) receives error messages instead of a message
+    box; with both, no Tk dialog is involved, so this can run headless or
+    from a worker thread.
+    """
     if not whisper_output or not original_file_path:
         if status_callback:
             status_callback("No transcription data available", "red")
         return False
     
-    # Prepare file dialog
-    filetypes = [('SubRip Subtitle', '*.srt')]
-    initial_filename = os.path.splitext(os.path.basename(original_file_path))[0] + '.srt'
-    initial_dir = os.path.dirname(original_file_path)
-    
-    save_path = filedialog.asksaveasfilename(
-        title="Save SRT Subtitle File",
-        defaultextension=".srt",
-        initialfile=initial_filename,
-        initialdir=initial_dir,
-        filetypes=filetypes,
-        parent=parent_window
-    )
+    if save_path is None:
+        # Tk is only needed for the dialog, so callers that pass a path or just
+        # convert text don't import it
+        import tkinter.filedialog as filedialog
+        
+        # Prepare file dialog
+        filetypes = [('SubRip Subtitle', '*.srt')]
+        initial_filename = os.path.splitext(os.path.basename(original_file_path))[0] + '.srt'
+        initial_dir = os.path.dirname(original_file_path)
+        
+        save_path = filedialog.asksaveasfilename(
+            title="Save SRT Subtitle File",
+            defaultextension=".srt",
+            initialfile=initial_filename,
+            initialdir=initial_dir,
+            filetypes=filetypes,
+            parent=parent_window
+        )
     
     if save_path:
         try:
-            srt_content = whisper_to_srt(whisper_output)
-            with open(save_path, 'w', encoding='utf-8') as srt_file:
-                srt_file.write(srt_content)
+            # Entries are streamed into the file rather than joined first
+            with open(save_path, 'w', encoding='utf-8', buffering=SRT_BUFFER_SIZE) as srt_file:
+                srt_file.writelines(iter_srt(whisper_output))
             if status_callback:
                 status_callback(f"SRT file saved to {save_path}", "green")
             return True
         except Exception as e:
             error_msg = f"Error saving SRT file: {str(e)}"
-            if status_callback:
+            if error_callback:
+                error_callback(error_msg)
+            elif status_callback:
                 status_callback(error_msg, "red")
             else:
+                import tkinter.messagebox as messagebox
                 messagebox.showerror("SRT Saving Error", error_msg)
             return False
     else:
         if status_callback:
             status_callback("SRT file saving cancelled", "blue")
-        return False
\ No newline at end of file
+        return False
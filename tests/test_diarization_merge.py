@@ -0,0 +1,99 @@
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diarization_gui import DiarizationSegments, merge_diarization, parse_srt, srt_time_to_seconds
+
+
+def _split_parse_srt(srt_content):
+    # The block-splitting parser the single-pass one replaced
+    entries = []
+    for block in re.split(r'\n\s*\n', srt_content.strip()):
+        lines = block.splitlines()
+        if len(lines) >= 3:
+            match = re.match(r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', lines[1].strip())
+            if match:
+                start_str, end_str = match.groups()
+                entries.append({
+                    'index': lines[0].strip(),
+                    'start_str': start_str,
+                    'end_str': end_str,
+                    'start': srt_time_to_seconds(start_str),
+                    'end': srt_time_to_seconds(end_str),
+                    'text': "\n".join(lines[2:]).strip(),
+                })
+    return entries
+
+
+def _scan_merge(srt_content, segments, remove_timestamps):
+    # The linear-scan merge and srt_lines join the searchsorted one replaced
+    srt_lines = []
+    for entry in _split_parse_srt(srt_content):
+        speaker_label = "[Speaker Unknown]: "
+        for seg_start, seg_end, speaker_num, gender, orig_label in segments:
+            if seg_start <= entry['start'] < seg_end:
+                speaker_label = f"[Speaker {speaker_num}]: "
+                break
+        if not remove_timestamps:
+            srt_lines.append(entry['index'])
+            srt_lines.append(f"{entry['start_str']} --> {entry['end_str']}")
+        srt_lines.append(f"{speaker_label}{entry['text']}")
+        srt_lines.append("")
+    return "\n".join(srt_lines)
+
+
+SRT = (
+    "1\n00:00:00,500 --> 00:00:01,000\nBefore anyone speaks.\n\n"
+    "2\n00:00:01,000 --> 00:00:03,000\nFirst speaker,\ntwo lines.\n\n"
+    "3\n00:00:04,200 --> 00:00:04,900\nIn the gap.\n\n"
+    "4\n00:00:05,000 --> 00:00:07,000\nSecond speaker.\n\n"
+    "5\n00:00:09,000 --> 00:00:10,000\nAfter the last segment.\n"
+)
+
+SEGMENTS = [
+    (5.0, 8.0, 2, "male", "male"),
+    (1.0, 4.0, 1, "female", "female"),
+]
+
+
+class ParseSrtTest(unittest.TestCase):
+    def test_matches_block_parser(self):
+        messy = "\n\n" + SRT.replace("\n\n", "\n   \n", 1) + "\n6\nnot a timing\ntext\n\n7\n00:00:11,000 --> 00:00:12,000\n"
+        self.assertEqual(parse_srt(messy), _split_parse_srt(messy))
+        self.assertEqual(parse_srt(""), [])
+
+
+class MergeDiarizationTest(unittest.TestCase):
+    def _merge(self, segments, remove_timestamps=False):
+        return merge_diarization("unused.wav", SRT, remove_timestamps=remove_timestamps,
+                                 diarization_segments=segments)
+
+    def test_labels(self):
+        labels = [line for line in self._merge(SEGMENTS, remove_timestamps=True).split("\n")
+                  if line.startswith("[Speaker")]
+        self.assertEqual(labels, [
+            "[Speaker Unknown]: Before anyone speaks.",   # before the first segment
+            "[Speaker 1]: First speaker,",
+            "[Speaker Unknown]: In the gap.",
+            "[Speaker 2]: Second speaker.",
+            "[Speaker Unknown]: After the last segment.",
+        ])
+
+    def test_empty_segments(self):
+        merged = self._merge([])
+        self.assertEqual(merged.count("[Speaker Unknown]: "), 5)
+        self.assertEqual(merged, _scan_merge(SRT, [], False))
+
+    def test_output_matches_old_join(self):
+        for remove_timestamps in (False, True):
+            expected = _scan_merge(SRT, SEGMENTS, remove_timestamps)
+            self.assertEqual(self._merge(SEGMENTS, remove_timestamps), expected)
+            self.assertEqual(self._merge(DiarizationSegments.from_tuples(SEGMENTS), remove_timestamps), expected)
+        self.assertEqual(merge_diarization("unused.wav", "", diarization_segments=SEGMENTS), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SoftWhisper import _lcs_suffix_prefix, _merge_overlap
+
+
+def _seg(t0, t1, text):
+    return {'t0': t0, 't1': t1, 'text': text}
+
+
+class MergeOverlapTest(unittest.TestCase):
+    def test_common_run_is_kept_once(self):
+        prev = [_seg(0, 3400, "we went down to the river"), _seg(3400, 3600, "and then we swam")]
+        nxt = [_seg(3500, 3600, "then we swam"), _seg(3600, 4000, "across to the other side")]
+        merged = _merge_overlap(prev, nxt, 3500, 3600)
+        self.assertEqual(" ".join(seg['text'] for seg in merged),
+                         "we went down to the river and then we swam across to the other side")
+
+    def test_single_common_word_is_not_an_anchor(self):
+        # "the" early in the tail and late in the head must not align the chunks
+        a = ["the", "cat", "sat", "on", "a", "mat"]
+        b = ["dogs", "ran", "out", "of", "the"]
+        self.assertIsNone(_lcs_suffix_prefix(a, b))
+
+        prev = [_seg(3000, 3600, "the cat sat on a mat")]
+        nxt = [_seg(3560, 4000, "dogs ran out of the")]
+        merged = _merge_overlap(prev, nxt, 3500, 3600)
+        # Falls back to the mid-overlap cut instead of dropping text in between
+        self.assertEqual(merged, prev + nxt)
+
+    def test_fallback_keeps_segment_running_past_the_overlap(self):
+        # The next chunk's first segment starts inside the overlap, before
+        # the mid-point cut, but carries speech well beyond it
+        prev = [_seg(3000, 3600, "the quick brown fox jumps over")]
+        nxt = [_seg(3500, 4100, "over the lazy dog and then"), _seg(4100, 4500, "it ran away")]
+        merged = _merge_overlap(prev, nxt, 3500, 3600)
+        self.assertEqual(merged, prev + nxt)
+
+    def test_run_far_from_the_overlap_is_rejected(self):
+        a = ["one", "two", "three", "x", "y", "z", "p", "q"]
+        b = ["r", "s", "t", "u", "one", "two", "three"]
+        self.assertIsNone(_lcs_suffix_prefix(a, b))
+
+
+if __name__ == "__main__":
+    unittest.main()
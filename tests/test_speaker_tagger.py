@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import speaker_tagger
+except ImportError:  # librosa, scikit-learn or inaSpeechSegmenter not installed
+    speaker_tagger = None
+
+
+def _loop_merge_segments(segments, gap_threshold=0.5):
+    # The loop merge_segments replaced
+    if not segments:
+        return segments
+    merged = [segments[0]]
+    for seg in segments[1:]:
+        last_seg = merged[-1]
+        if seg[0] == last_seg[0] and (float(seg[1]) - float(last_seg[2])) <= gap_threshold:
+            merged[-1] = (last_seg[0], last_seg[1], seg[2]) + last_seg[3:]
+        else:
+            merged.append(seg)
+    return merged
+
+
+@unittest.skipIf(speaker_tagger is None, "speaker_tagger dependencies are not installed")
+class MergeSegmentsTest(unittest.TestCase):
+    def test_matches_loop(self):
+        segments = [
+            ("male", 0.0, 1.0),
+            ("male", 1.5, 2.0),     # gap exactly at the threshold: merged
+            ("male", 2.5, 3.0),     # again at the threshold: same run
+            ("male", 3.75, 4.0),    # gap above the threshold: new run
+            ("female", 4.0, 5.0),   # label change with no gap: new run
+            ("female", 5.25, 6.0),
+            ("male", 6.0, 7.0),
+        ]
+        merged = speaker_tagger.merge_segments(segments)
+        self.assertEqual(merged, _loop_merge_segments(segments))
+        self.assertEqual(merged, [
+            ("male", 0.0, 3.0),
+            ("male", 3.75, 4.0),
+            ("female", 4.0, 6.0),
+            ("male", 6.0, 7.0),
+        ])
+
+    def test_edge_cases(self):
+        self.assertEqual(speaker_tagger.merge_segments([]), [])
+        single = [("noise", 0.0, 1.0)]
+        self.assertEqual(speaker_tagger.merge_segments(single), single)
+        rng = np.random.default_rng(0)
+        ends = np.cumsum(rng.uniform(0.0, 1.0, 200))
+        segments = [(str(rng.choice(["male", "female", "music"])), float(end - 0.3), float(end + rng.uniform(0.1, 0.6)))
+                    for end in ends]
+        self.assertEqual(speaker_tagger.merge_segments(segments), _loop_merge_segments(segments))
+
+
+@unittest.skipIf(speaker_tagger is None, "speaker_tagger dependencies are not installed")
+class MeanStdTest(unittest.TestCase):
+    def test_matches_numpy(self):
+        rng = np.random.default_rng(1)
+        features = (rng.standard_normal((3, 40, 157)) * 30 + 100).astype(np.float32)
+        # Laid out per feature type: its means, then its standard deviations
+        expected = np.stack([features.mean(axis=-1, dtype=np.float64),
+                             features.std(axis=-1, dtype=np.float64)], axis=1).ravel()
+        np.testing.assert_allclose(speaker_tagger._mean_std(features), expected, rtol=1e-7, atol=1e-9)
+
+    def test_constant_rows_have_zero_std(self):
+        features = np.full((1, 4, 9), 7.5)
+        mean, std = speaker_tagger._mean_std(features).reshape(2, 4)
+        np.testing.assert_array_equal(mean, 7.5)
+        np.testing.assert_array_equal(std, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
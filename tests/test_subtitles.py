@@ -0,0 +1,63 @@
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subtitles import _is_srt, iter_srt, whisper_to_srt
+
+
+def _regex_to_srt(whisper_output):
+    # The regex-based converter the fixed-offset parser replaced
+    srt_parts = []
+    counter = 1
+    for line in whisper_output.strip().split('\n'):
+        match = re.match(r'\[(\d{2}:\d{2}:\d{2}\.\d{3}) --> (\d{2}:\d{2}:\d{2}\.\d{3})\] (.*)', line.strip())
+        if match:
+            start_time, end_time, text = match.groups()
+            srt_parts.append(f"{counter}")
+            srt_parts.append(f"{start_time.replace('.', ',')} --> {end_time.replace('.', ',')}")
+            srt_parts.append(f"{text.strip()}")
+            srt_parts.append("")
+            counter += 1
+    return "\n".join(srt_parts)
+
+
+class WhisperToSrtTest(unittest.TestCase):
+    def test_normal_lines(self):
+        output = ("[00:00:00.000 --> 00:00:02.500]   Hello there.\n"
+                  "[00:00:02.500 --> 01:02:03.040]  General Kenobi!\n")
+        self.assertEqual(whisper_to_srt(output),
+                         "1\n00:00:00,000 --> 00:00:02,500\nHello there.\n\n"
+                         "2\n00:00:02,500 --> 01:02:03,040\nGeneral Kenobi!\n")
+        self.assertEqual(whisper_to_srt(output), _regex_to_srt(output))
+
+    def test_empty_text(self):
+        # A timing with nothing after it is not an entry, as with the regex
+        output = ("[00:00:00.000 --> 00:00:01.000]\n"
+                  "[00:00:01.000 --> 00:00:02.000]   \n"
+                  "[00:00:02.000 --> 00:00:03.000]  Words\n")
+        self.assertEqual(whisper_to_srt(output), "1\n00:00:02,000 --> 00:00:03,000\nWords\n")
+        self.assertEqual(whisper_to_srt(output), _regex_to_srt(output))
+
+    def test_already_srt_passes_through(self):
+        srt = "1\n00:00:00,000 --> 00:00:02,500\nHello there.\n\n2\n00:00:02,500 --> 00:00:04,000\nBye.\n"
+        self.assertTrue(_is_srt(srt))
+        self.assertEqual(list(iter_srt(srt)), [srt])
+        self.assertEqual(whisper_to_srt(srt), srt)
+
+    def test_malformed_lines_are_skipped(self):
+        output = ("whisper_init_from_file: loading model\n"
+                  "[00:00:00.000 -> 00:00:01.000]  bad arrow\n"
+                  "[00:00:00,000 --> 00:00:01,000] commas\n"
+                  "[0:00:00.000 --> 00:00:01.000]  short hours\n"
+                  "[00:00:01.000 --> 00:00:02.000]  good\n"
+                  "\n")
+        self.assertFalse(_is_srt(output))
+        self.assertEqual(whisper_to_srt(output), "1\n00:00:01,000 --> 00:00:02,000\ngood\n")
+        self.assertEqual(whisper_to_srt(""), "")
+
+
+if __name__ == "__main__":
+    unittest.main()